@@ -7,6 +7,7 @@ from fastapi import APIRouter, Query, Path, status
 from app.services.order_service import OrderService
 from app.models.order import OrderCreate, OrderListResponse
 from app.core.config import settings
+from app.core.responses import TrustedJSONResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -51,7 +52,7 @@ async def get_user_orders(
             offset=offset
         )
         logger.info(f"Retrieved {len(result['data'])} orders for user {user_id}")
-        return result
+        return TrustedJSONResponse(result)
     except Exception as e:
         logger.error(f"Failed to get orders for user {user_id}: {e}")
         raise
@@ -3,11 +3,12 @@ Product API endpoints
 """
 import logging
 from typing import Optional
-from fastapi import APIRouter, Query, status, HTTPException
+from fastapi import APIRouter, Query, Path, status, HTTPException
 
 from app.services.product_service import ProductService
-from app.models.product import ProductCreate, ProductListResponse
+from app.models.product import ProductCreate, ProductDetailResponse, ProductListResponse, ProductSort
 from app.core.config import settings
+from app.core.responses import RawBSONListResponse, TrustedJSONResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -36,27 +37,73 @@ async def create_product(product_data: ProductCreate):
 async def get_products(
     name: Optional[str] = Query(None, description="Filter by product name (supports partial search)"),
     size: Optional[str] = Query(None, description="Filter by available size"),
+    in_stock: bool = Query(False, alias="inStock", description="Only products with quantity available"),
+    min_price: Optional[float] = Query(None, alias="minPrice", ge=0, description="Minimum price"),
+    max_price: Optional[float] = Query(None, alias="maxPrice", ge=0, description="Maximum price"),
+    sort: Optional[ProductSort] = Query(None, description="Sort order"),
+    ids: Optional[str] = Query(None, description="Comma-separated product IDs to fetch"),
     limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE, description="Number of products to return"),
-    offset: int = Query(0, ge=0, description="Number of products to skip")
+    offset: int = Query(0, ge=0, description="Number of products to skip"),
+    facets: bool = Query(False, description="Include the total and per-size counts"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page (replaces offset)")
 ):
     """
     Get products with optional filtering and pagination
     
     - **name**: Filter by product name (partial search supported)
     - **size**: Filter products that have this size available
+    - **inStock**: Only list products in stock (in the given size, if any), with per-size availability
+    - **minPrice** / **maxPrice**: Filter by price range (inclusive)
+    - **sort**: price_asc, price_desc, name_asc or name_desc (insertion order by default)
+    - **ids**: Fetch these products instead of filtering (other parameters are ignored)
     - **limit**: Number of products to return (1-100)
     - **offset**: Number of products to skip for pagination
+    - **facets**: Include the total and per-size product counts for the filtered results
+    - **cursor**: Continue after the previous page using its page.cursor, for deep pages
     """
     try:
         service = ProductService()
+        if ids is not None:
+            product_ids = [product_id.strip() for product_id in ids.split(",") if product_id.strip()]
+            result = await service.get_products_by_ids(product_ids)
+            logger.info(f"Retrieved {len(result['data'])} of {len(product_ids)} requested products")
+            return TrustedJSONResponse(result)
+        
         result = await service.get_products(
             name=name,
             size=size,
             limit=limit,
-            offset=offset
+            offset=offset,
+            facets=facets,
+            min_price=min_price,
+            max_price=max_price,
+            sort=sort.value if sort is not None else None,
+            cursor=cursor,
+            in_stock=in_stock
         )
         logger.info(f"Retrieved {len(result['data'])} products")
-        return result
+        if settings.PRODUCT_LIST_RAW_BSON:
+            return RawBSONListResponse(result)
+        return TrustedJSONResponse(result)
     except Exception as e:
         logger.error(f"Failed to get products: {e}")
         raise
+
+
+@router.get("/products/{product_id}", response_model=ProductDetailResponse)
+async def get_product(
+    product_id: str = Path(..., description="Product ID")
+):
+    """
+    Get a single product with its sizes
+    
+    - **product_id**: Product ID to retrieve
+    """
+    try:
+        service = ProductService()
+        result = await service.get_product(product_id)
+        logger.info(f"Retrieved product {product_id}")
+        return TrustedJSONResponse(result)
+    except Exception as e:
+        logger.error(f"Failed to get product {product_id}: {e}")
+        raise
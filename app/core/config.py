@@ -2,8 +2,8 @@
 Application configuration settings
 """
 import os
-from typing import Optional
-from pydantic_settings import BaseSettings
+from typing import Dict, Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -17,12 +17,85 @@ class Settings(BaseSettings):
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
+    # Read routing - repository methods not listed here read from the primary
+    READ_PREFERENCES: Dict[str, str] = {
+        "ProductRepository.get_products": "secondaryPreferred",
+        "OrderRepository.get_user_orders": "secondaryPreferred",
+    }
+    MAX_STALENESS_SECONDS: int = 90
+    CAUSAL_CONSISTENCY_ENABLED: bool = False
+    # Signs X-Causal-Token; when empty, a random per-process key is used, so
+    # set it when several workers or instances serve the same clients
+    CAUSAL_TOKEN_SECRET: str = ""
+    
+    # Order archival - orders older than this move to orders_archive
+    ORDER_ARCHIVE_AFTER_DAYS: int = 180
+    ORDER_ARCHIVE_BATCH_SIZE: int = 1000
+    
+    # Order history cache - each user's newest orders, updated on create
+    ORDER_HISTORY_CACHE_ORDERS: int = 30
+    ORDER_HISTORY_CACHE_MAX_USERS: int = 10000
+    ORDER_HISTORY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    ORDER_HISTORY_CACHE_TTL_SECONDS: float = 60.0
+    
+    # Product lookup cache
+    PRODUCT_CACHE_TTL_SECONDS: float = 5.0
+    PRODUCT_CACHE_MAX_ENTRIES: int = 10000
+    PRODUCT_FACETS_TTL_SECONDS: float = 30.0
+    
+    # Read product listings as raw BSON and convert them straight to JSON.
+    # Off by default: decoding the server-shaped rows with pymongo's C
+    # extension is faster (see scripts/benchmark_raw_bson.py)
+    PRODUCT_LIST_RAW_BSON: bool = False
+    
     # Pagination defaults
     DEFAULT_PAGE_SIZE: int = 10
     MAX_PAGE_SIZE: int = 100
-    
-    class Config:
-        env_file = ".env"
+
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_OFFLOAD_SIZE: int = 64 * 1024
+    GZIP_COMPRESSION_LEVEL: int = 6
+    BROTLI_COMPRESSION_QUALITY: int = 4
+
+    # Admission control - maximum concurrency and latency target per route
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_BUDGETS: Dict[str, int] = {
+        "GET /products": 64,
+        "GET /products/{product_id}": 64,
+        "POST /orders": 32,
+        "GET /orders/{user_id}": 32,
+    }
+    ADMISSION_LATENCY_TARGETS_MS: Dict[str, int] = {
+        "GET /products": 200,
+        "GET /products/{product_id}": 100,
+        "POST /orders": 300,
+        "GET /orders/{user_id}": 300,
+    }
+    ADMISSION_MIN_LIMIT: int = 4
+    ADMISSION_MAX_QUEUE_WAIT_MS: int = 100
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # Request deadlines, applied to MongoDB queries as maxTimeMS
+    REQUEST_TIMEOUT_MS: int = 10000
+    MAX_REQUEST_TIMEOUT_MS: int = 30000
+    REQUEST_TIMEOUTS_MS: Dict[str, int] = {
+        "GET /products": 2000,
+        "GET /products/{product_id}": 1000,
+        "POST /orders": 5000,
+        "GET /orders/{user_id}": 3000,
+    }
+
+    # Request profiling - requests carrying a valid signed X-Profile header,
+    # or a random sample of them, are profiled into a ring of flamegraph files
+    PROFILING_ENABLED: bool = False
+    PROFILE_SECRET: str = ""
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_FILES: int = 100
+
+    model_config = SettingsConfigDict(env_file=".env")
 
 
 settings = Settings()
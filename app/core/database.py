@@ -1,31 +1,161 @@
 """
 Database connection and management
 """
+import base64
+import binascii
+import hashlib
+import hmac
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient
+import secrets
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+import bson
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession
 from pymongo.errors import ConnectionFailure
+from pymongo.read_preferences import (
+    ReadPreference,
+    make_read_preference,
+    read_pref_mode_from_name,
+)
 
 from app.core.config import settings
+from app.core.profiling import mongo_timing_listener
 
 
 class Database:
     client: AsyncIOMotorClient = None
     database = None
+    routed_databases: dict = {}
 
 
 db = Database()
 
+# Index for every product listing, keyed by (filtered by size, in stock
+# only, sort field). Size is the only equality filter, so it leads; the sort
+# field and the _id tiebreaker follow, then price so price ranges are
+# checked on index keys. Descending sorts walk the same indexes backwards.
+#
+# Size listings also key sizes.quantity, so an in-stock $elemMatch on a size
+# gets bounds on the same array element. In-stock listings without a size
+# use partial indexes over IN_STOCK_FILTER; their keys are reversed only so
+# that their key patterns differ from the full indexes.
+IN_STOCK_FILTER = {"sizes.quantity": {"$gt": 0}}
+
+PRODUCT_LISTING_INDEXES: Dict[Tuple[bool, bool, str], List[Tuple[str, int]]] = {
+    (False, False, "_id"): [("_id", 1), ("price", 1)],
+    (False, False, "price"): [("price", 1), ("_id", 1)],
+    (False, False, "name"): [("name", 1), ("_id", 1), ("price", 1)],
+    (False, True, "_id"): [("_id", -1), ("price", -1)],
+    (False, True, "price"): [("price", -1), ("_id", -1)],
+    (False, True, "name"): [("name", -1), ("_id", -1), ("price", -1)],
+    (True, False, "_id"): [("sizes.size", 1), ("_id", 1), ("price", 1), ("sizes.quantity", 1)],
+    (True, False, "price"): [("sizes.size", 1), ("price", 1), ("_id", 1), ("sizes.quantity", 1)],
+    (True, False, "name"): [("sizes.size", 1), ("name", 1), ("_id", 1), ("price", 1), ("sizes.quantity", 1)],
+    (True, True, "_id"): [("sizes.size", 1), ("_id", 1), ("price", 1), ("sizes.quantity", 1)],
+    (True, True, "price"): [("sizes.size", 1), ("price", 1), ("_id", 1), ("sizes.quantity", 1)],
+    (True, True, "name"): [("sizes.size", 1), ("name", 1), ("_id", 1), ("price", 1), ("sizes.quantity", 1)],
+}
+
+_causal_token_key = (settings.CAUSAL_TOKEN_SECRET or secrets.token_hex(32)).encode()
+
+_session: ContextVar[Optional[AsyncIOMotorClientSession]] = ContextVar("mongo_session", default=None)
+
+
+def get_read_preference(operation: str):
+    """Read preference configured for a repository method, primary by default"""
+    mode = settings.READ_PREFERENCES.get(operation, "primary")
+    if mode == "primary":
+        return ReadPreference.PRIMARY
+    return make_read_preference(
+        read_pref_mode_from_name(mode), None, settings.MAX_STALENESS_SECONDS
+    )
+
+
+async def get_database(operation: Optional[str] = None):
+    """
+    Get database instance
+
+    When operation names a repository method (e.g. "ProductRepository.get_products"),
+    the returned handle routes reads with that method's configured read preference.
+    """
+    if operation is None:
+        return db.database
+
+    database = db.routed_databases.get(operation)
+    if database is None:
+        database = db.database.with_options(read_preference=get_read_preference(operation))
+        db.routed_databases[operation] = database
+    return database
+
+
+def get_session() -> Optional[AsyncIOMotorClientSession]:
+    """Causally consistent session for the current request, if any"""
+    return _session.get()
 
-async def get_database():
-    """Get database instance"""
-    return db.database
+
+def encode_causal_token(session: AsyncIOMotorClientSession) -> Optional[str]:
+    """Encode the session's operation and cluster time for the client to send back"""
+    if session.operation_time is None or session.cluster_time is None:
+        return None
+    data = base64.urlsafe_b64encode(bson.encode({
+        "operationTime": session.operation_time,
+        "clusterTime": session.cluster_time
+    })).decode()
+    return f"{data}.{_sign_causal_token(data)}"
+
+
+def _sign_causal_token(data: str) -> str:
+    return hmac.new(_causal_token_key, data.encode(), hashlib.sha256).hexdigest()
+
+
+def _decode_causal_token(token: str) -> Optional[dict]:
+    """Cluster and operation time from a token, or None unless we signed it"""
+    data, _, signature = token.rpartition(".")
+    if not data or not hmac.compare_digest(signature, _sign_causal_token(data)):
+        return None
+    try:
+        return bson.decode(base64.urlsafe_b64decode(data))
+    except (binascii.Error, bson.errors.BSONError, ValueError):
+        return None
+
+
+@asynccontextmanager
+async def causal_session(token: Optional[str] = None):
+    """
+    Run the enclosed operations in a causally consistent session.
+
+    A token from encode_causal_token advances the session, so reads routed to
+    a secondary wait until it has caught up with the write that issued it.
+    """
+    async with await db.client.start_session(causal_consistency=True) as session:
+        if token:
+            times = _decode_causal_token(token)
+            if times is None:
+                logging.warning("Ignoring causal consistency token that failed verification")
+            else:
+                try:
+                    session.advance_cluster_time(times["clusterTime"])
+                    session.advance_operation_time(times["operationTime"])
+                except Exception as e:
+                    logging.warning(f"Ignoring invalid causal consistency token: {e}")
+
+        reset_token = _session.set(session)
+        try:
+            yield session
+        finally:
+            _session.reset(reset_token)
 
 
 async def connect_to_mongo():
     """Create database connection"""
     try:
-        db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+        # Command monitoring costs a callback per command, so only when profiling
+        event_listeners = [mongo_timing_listener] if settings.PROFILING_ENABLED else []
+        db.client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=event_listeners)
         db.database = db.client[settings.DATABASE_NAME]
+        db.routed_databases = {}
         
         # Test connection
         await db.client.admin.command('ping')
@@ -49,14 +179,24 @@ async def close_mongo_connection():
 async def create_indexes():
     """Create database indexes for better performance"""
     try:
-        # Products collection indexes
-        await db.database.products.create_index("name")
-        await db.database.products.create_index("sizes.size")
+        # Products collection indexes - one per listing filter and sort
+        created = []
+        for (by_size, in_stock, _), keys in PRODUCT_LISTING_INDEXES.items():
+            if keys in created:
+                continue
+            created.append(keys)
+            if in_stock and not by_size:
+                await db.database.products.create_index(keys, partialFilterExpression=IN_STOCK_FILTER)
+            else:
+                await db.database.products.create_index(keys)
         
-        # Orders collection indexes
-        await db.database.orders.create_index("userId")
+        # Orders collection indexes - history is read newest first per user
+        await db.database.orders.create_index([("userId", 1), ("_id", -1)])
         await db.database.orders.create_index("createdAt")
         
+        # Archived orders are only read for history pages
+        await db.database.orders_archive.create_index([("userId", 1), ("_id", -1)])
+        
         logging.info("Database indexes created successfully")
     except Exception as e:
         logging.error(f"Failed to create indexes: {e}")
@@ -0,0 +1,44 @@
+"""
+Per-request deadlines
+"""
+import time
+from contextvars import ContextVar, Token
+from typing import Dict, Optional
+
+from app.core.exceptions import RequestTimeoutError
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def set_deadline(timeout: float) -> Token:
+    """Start a deadline that expires timeout seconds from now"""
+    return _deadline.set(time.monotonic() + timeout)
+
+
+def get_deadline() -> Optional[float]:
+    """Monotonic time the current deadline expires at, or None"""
+    return _deadline.get()
+
+
+def reset_deadline(token: Token):
+    """Restore the deadline that was active before set_deadline"""
+    _deadline.reset(token)
+
+
+def remaining_ms() -> Optional[int]:
+    """Milliseconds left before the deadline, or None when there is no deadline"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+
+    remaining = int((deadline - time.monotonic()) * 1000)
+    if remaining <= 0:
+        raise RequestTimeoutError()
+    return remaining
+
+
+def max_time_ms() -> Dict[str, int]:
+    """maxTimeMS keyword argument for aggregate and count_documents"""
+    remaining = remaining_ms()
+    return {} if remaining is None else {"maxTimeMS": remaining}
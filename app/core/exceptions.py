@@ -28,3 +28,9 @@ class DatabaseError(AppException):
     """Database error exception"""
     def __init__(self, detail: str = "Database operation failed"):
         super().__init__(status_code=500, detail=detail)
+
+
+class RequestTimeoutError(AppException):
+    """Request deadline exceeded exception"""
+    def __init__(self, detail: str = "Request deadline exceeded"):
+        super().__init__(status_code=504, detail=detail)
@@ -0,0 +1,129 @@
+"""
+Write-through cache of users' most recent orders
+"""
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from app.core.metrics import metrics
+
+
+def _deep_size(value: Any) -> int:
+    """Approximate memory held by a formatted row; dict keys are shared"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(item) for item in value.values())
+    elif isinstance(value, list):
+        size += sum(_deep_size(item) for item in value)
+    return size
+
+
+class _Entry:
+    __slots__ = ("orders", "total", "size", "expires_at")
+
+    def __init__(self, orders: List[Dict[str, Any]], total: int, size: int, expires_at: float):
+        self.orders = orders
+        self.total = total
+        self.size = size
+        self.expires_at = expires_at
+
+
+class OrderHistoryCache:
+    """
+    LRU cache of the newest formatted orders of each user, newest first.
+
+    Each entry keeps up to max_orders orders and the user's total order
+    count, so pages within them are served without a query. New orders are
+    prepended to the entry rather than invalidating it. The cache is bounded
+    by max_users entries and by max_bytes of approximate memory; entries
+    also expire after ttl seconds so writes made by other processes show up.
+
+    A fill is only stored if no order was prepended for the user while it
+    was being read, so a slow read cannot overwrite a newer order.
+    """
+
+    def __init__(self, max_orders: int, max_users: int, max_bytes: int, ttl: float):
+        self.max_orders = max_orders
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._fills: Dict[Hashable, object] = {}
+        self._hits = 0
+        self._lookups = 0
+
+    def get_page(self, key: Hashable, offset: int, limit: int) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+        """A page of orders and the total count, or None when not cached"""
+        entry = self._entries.get(key)
+        hit = (
+            entry is not None
+            and entry.expires_at > time.monotonic()
+            and (offset + limit <= len(entry.orders) or len(entry.orders) == entry.total)
+        )
+        self._lookups += 1
+        if not hit:
+            metrics.inc("order_history_cache_misses_total")
+            metrics.set("order_history_cache_hit_ratio", self._hits / self._lookups)
+            return None
+
+        self._hits += 1
+        metrics.inc("order_history_cache_hits_total")
+        metrics.set("order_history_cache_hit_ratio", self._hits / self._lookups)
+        self._entries.move_to_end(key)
+        return entry.orders[offset:offset + limit], entry.total
+
+    def begin_fill(self, key: Hashable) -> object:
+        """Start reading a user's recent orders; the newest fill wins"""
+        token = object()
+        self._fills[key] = token
+        return token
+
+    def complete_fill(self, key: Hashable, token: object, orders: List[Dict[str, Any]], total: int):
+        """Store the recent orders read for a fill, unless it was superseded"""
+        if self._fills.get(key) is not token:
+            return
+        orders = orders[:self.max_orders]
+        self._store(key, _Entry(orders, total, _deep_size(orders), time.monotonic() + self.ttl))
+
+    def end_fill(self, key: Hashable, token: object):
+        """Forget a fill, whether or not it completed"""
+        if self._fills.get(key) is token:
+            del self._fills[key]
+
+    def prepend(self, key: Hashable, order: Dict[str, Any]):
+        """Add a user's new order in front of the cached ones"""
+        self._fills.pop(key, None)
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return
+        # A fill that finished after the insert may already include it
+        if any(cached["id"] == order["id"] for cached in entry.orders):
+            return
+
+        orders = [order] + entry.orders[:self.max_orders - 1]
+        self._store(key, _Entry(orders, entry.total + 1, _deep_size(orders), entry.expires_at))
+
+    def _store(self, key: Hashable, entry: _Entry):
+        self._remove(key)
+        self._entries[key] = entry
+        self.size += entry.size
+        while self._entries and (len(self._entries) > self.max_users or self.size > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+            metrics.inc("order_history_cache_evictions_total")
+        self._report()
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+            self._report()
+
+    def _report(self):
+        metrics.set("order_history_cache_users", len(self._entries))
+        metrics.set("order_history_cache_bytes", self.size)
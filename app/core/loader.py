@@ -0,0 +1,138 @@
+"""
+Batching loader with a short-lived per-key cache
+"""
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.core.deadline import get_deadline, remaining_ms, reset_deadline, set_deadline
+from app.core.exceptions import RequestTimeoutError
+from app.core.metrics import metrics
+
+BatchFunction = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class BatchLoader:
+    """
+    DataLoader-style loader that coalesces lookups into batch queries.
+
+    Keys requested during the same event loop tick, from any request, are
+    collected and resolved with a single call to batch_fn, which returns a
+    mapping of key to value (missing keys resolve to None). Results are
+    cached per key for ttl seconds.
+
+    The batch runs in an empty context so it never inherits one caller's
+    database session. It runs under the latest deadline of its callers, so
+    its query is bounded but still serves the most patient caller; each
+    caller waits with its own deadline.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: BatchFunction,
+        ttl: float,
+        max_batch_size: int = 500,
+        max_entries: int = 10000
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.ttl = ttl
+        self.max_batch_size = max_batch_size
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._deadlines: Dict[Hashable, Optional[float]] = {}
+        self._dispatch_scheduled = False
+
+    async def load(self, key: Hashable) -> Any:
+        """Load one value, batched with other loads in the same tick"""
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            metrics.inc("loader_cache_hits_total", loader=self.name)
+            return cached[1]
+        metrics.inc("loader_cache_misses_total", loader=self.name)
+
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = future
+            self._deadlines[key] = get_deadline()
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(self._dispatch, context=contextvars.Context())
+        else:
+            self._deadlines[key] = _latest(self._deadlines[key], get_deadline())
+
+        timeout = remaining_ms()
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(future),
+                timeout / 1000 if timeout is not None else None
+            )
+        except asyncio.TimeoutError:
+            raise RequestTimeoutError()
+
+    async def load_many(self, keys: List[Hashable]) -> List[Any]:
+        """Load several values, in the order of keys"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one cached key, or the whole cache"""
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def _dispatch(self):
+        pending, self._pending = self._pending, {}
+        deadlines, self._deadlines = self._deadlines, {}
+        self._dispatch_scheduled = False
+        keys = list(pending)
+        for start in range(0, len(keys), self.max_batch_size):
+            batch_keys = keys[start:start + self.max_batch_size]
+            batch = {key: pending[key] for key in batch_keys}
+            deadline = deadlines[batch_keys[0]]
+            for key in batch_keys[1:]:
+                deadline = _latest(deadline, deadlines[key])
+            asyncio.ensure_future(self._resolve(batch, deadline))
+
+    async def _resolve(self, batch: Dict[Hashable, asyncio.Future], deadline: Optional[float]):
+        metrics.inc("loader_batches_total", loader=self.name)
+        metrics.inc("loader_batch_keys_total", len(batch), loader=self.name)
+        token = set_deadline(deadline - time.monotonic()) if deadline is not None else None
+        try:
+            values = await self.batch_fn(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Callers that already timed out never retrieve it
+                    future.exception()
+            return
+        finally:
+            if token is not None:
+                reset_deadline(token)
+
+        expires_at = time.monotonic() + self.ttl
+        for key, future in batch.items():
+            value = values.get(key)
+            self._store(key, expires_at, value)
+            if not future.done():
+                future.set_result(value)
+
+    def _store(self, key: Hashable, expires_at: float, value: Any):
+        self._cache[key] = (expires_at, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+
+def _latest(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    """The later of two deadlines, where None means no deadline"""
+    if a is None or b is None:
+        return None
+    return max(a, b)
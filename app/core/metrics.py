@@ -0,0 +1,48 @@
+"""
+In-process metrics registry
+"""
+from collections import defaultdict
+from typing import Dict, Tuple
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Counters and gauges rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        self._gauges: Dict[str, Dict[LabelKey, float]] = defaultdict(dict)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str):
+        """Increment a counter"""
+        self._counters[name][tuple(sorted(labels.items()))] += value
+
+    def set(self, name: str, value: float, **labels: str):
+        """Set a gauge"""
+        self._gauges[name][tuple(sorted(labels.items()))] = value
+
+    def get(self, name: str, **labels: str) -> float:
+        """Get the current value of a counter or gauge"""
+        key = tuple(sorted(labels.items()))
+        if name in self._counters:
+            return self._counters[name].get(key, 0.0)
+        return self._gauges.get(name, {}).get(key, 0.0)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric_type, metrics in (("counter", self._counters), ("gauge", self._gauges)):
+            for name in sorted(metrics):
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in sorted(metrics[name].items()):
+                    if labels:
+                        label_text = ",".join(f'{key}="{val}"' for key, val in labels)
+                        lines.append(f"{name}{{{label_text}}} {value:g}")
+                    else:
+                        lines.append(f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,216 @@
+"""
+Per-request sampling profiler
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from pymongo import monitoring
+
+_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+MONGO_FRAME = "[mongo]"
+LOOP_WAIT_FRAME = "[event loop wait]"
+
+
+class RequestProfile:
+    """
+    Sampled stacks and time split for one request.
+
+    The request's task marks itself running while one of its steps executes
+    on the event loop thread, so a sampler thread can attribute the loop
+    thread's stack to this request without seeing other requests' work.
+    While the task is suspended, samples are recorded as Mongo time when one
+    of its commands is in flight and as event loop wait otherwise.
+    """
+
+    def __init__(self, name: str, interval_ms: float):
+        self.name = name
+        self.interval = interval_ms / 1000
+        self.samples: Counter = Counter()
+        self._cpu_time = 0.0
+        self.mongo_time = 0.0
+        self.mongo_in_flight = 0
+        self.running = False
+        self._thread_id = threading.get_ident()
+        self._step_started = 0.0
+        self._started = 0.0
+        self._finished = 0.0
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    @property
+    def cpu_time(self) -> float:
+        if self.running:
+            return self._cpu_time + time.perf_counter() - self._step_started
+        return self._cpu_time
+
+    @property
+    def wall_time(self) -> float:
+        return (self._finished or time.perf_counter()) - self._started
+
+    @property
+    def loop_wait_time(self) -> float:
+        return max(0.0, self.wall_time - self.cpu_time - self.mongo_time)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._finished = time.perf_counter()
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def resume(self):
+        self._step_started = time.perf_counter()
+        self.running = True
+
+    def suspend(self):
+        self.running = False
+        self._cpu_time += time.perf_counter() - self._step_started
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        if not self.running:
+            frame = MONGO_FRAME if self.mongo_in_flight > 0 else LOOP_WAIT_FRAME
+            self.samples[(self.name, frame)] += 1
+            return
+
+        frame = sys._current_frames().get(self._thread_id)
+        stack = []
+        while frame is not None and frame.f_code is not _STEP_CODE:
+            code = frame.f_code
+            stack.append(f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}")
+            frame = frame.f_back
+        # The step may have ended between the check and the snapshot
+        if frame is None or not self.running:
+            return
+        stack.append(self.name)
+        self.samples[tuple(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack format, as read by flamegraph tools"""
+        return "".join(
+            f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+
+class _ProfiledAwaitable:
+    """Drive a coroutine, marking the profile running during each step"""
+
+    def __init__(self, coro, profile: RequestProfile):
+        self.coro = coro
+        self.profile = profile
+
+    def __await__(self):
+        steps = self.coro.__await__()
+        advance, value = steps.send, None
+        while True:
+            self.profile.resume()
+            try:
+                awaited = advance(value)
+            except StopIteration as e:
+                return e.value
+            finally:
+                self.profile.suspend()
+
+            try:
+                value = yield awaited
+                advance = steps.send
+            except GeneratorExit:
+                steps.close()
+                raise
+            except BaseException as e:
+                value = e
+                advance = steps.throw
+
+
+_STEP_CODE = _ProfiledAwaitable.__await__.__code__
+
+
+async def run_profiled(coro, profile: RequestProfile):
+    """Await coro, sampling its stacks into profile"""
+    token = _profile.set(profile)
+    profile.start()
+    try:
+        return await _ProfiledAwaitable(coro, profile)
+    finally:
+        profile.stop()
+        _profile.reset(token)
+
+
+class MongoTimingListener(monitoring.CommandListener):
+    """
+    Add MongoDB command time to the profile of the request that issued it.
+
+    Motor runs commands on its executor in a copy of the caller's context,
+    so the profile set by the profiling middleware is visible here.
+    """
+
+    def started(self, event):
+        profile = _profile.get()
+        if profile is not None:
+            profile.mongo_in_flight += 1
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+    def _finished(self, event):
+        profile = _profile.get()
+        if profile is not None:
+            profile.mongo_in_flight -= 1
+            profile.mongo_time += event.duration_micros / 1_000_000
+
+
+mongo_timing_listener = MongoTimingListener()
+
+
+class ProfileRing:
+    """Bounded ring of collapsed-stack files; the oldest file is overwritten"""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._next_slot: Optional[int] = None
+
+    def _path(self, slot: int) -> str:
+        return os.path.join(self.directory, f"profile-{slot:04d}.folded")
+
+    def _first_slot(self) -> int:
+        # Continue after the newest file written by a previous process
+        newest, newest_slot = None, -1
+        for slot in range(self.max_files):
+            try:
+                mtime = os.path.getmtime(self._path(slot))
+            except OSError:
+                continue
+            if newest is None or mtime > newest:
+                newest, newest_slot = mtime, slot
+        return (newest_slot + 1) % self.max_files
+
+    def write(self, profile: RequestProfile) -> str:
+        """Write a profile to the next slot and return its path (blocking)"""
+        with self._lock:
+            if self._next_slot is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._next_slot = self._first_slot()
+            path = self._path(self._next_slot)
+            self._next_slot = (self._next_slot + 1) % self.max_files
+
+        with open(path, "w") as f:
+            f.write(profile.collapsed())
+        return path
@@ -0,0 +1,60 @@
+"""
+Response classes
+"""
+from typing import Any, Dict
+
+import bson
+from fastapi import Response
+from pydantic import TypeAdapter
+
+try:
+    import bsonjs
+except ImportError:  # pragma: no cover - python-bsonjs is optional
+    bsonjs = None
+
+
+# Compiled once and reused for every response
+_trusted_adapter = TypeAdapter(Dict[str, Any])
+_value_adapter = TypeAdapter(Any)
+
+
+class TrustedJSONResponse(Response):
+    """
+    JSON response for payloads built by our own repositories.
+
+    Returning a Response skips FastAPI's response_model validation, and the
+    payload is serialized in a single pass by pydantic-core. Only use it for
+    data whose shape is already guaranteed by the code that built it.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Dict[str, Any]) -> bytes:
+        return _trusted_adapter.dump_json(content)
+
+
+def encode_raw_bson(raw: bytes) -> bytes:
+    """JSON for a BSON document of strings and numbers"""
+    if bsonjs is not None:
+        return bsonjs.dumps(raw).encode()
+    return _trusted_adapter.dump_json(bson.decode(raw))
+
+
+class RawBSONListResponse(Response):
+    """
+    JSON response for a list payload whose "data" rows are RawBSONDocuments.
+
+    The rows must already be shaped into their response form by the query,
+    with only strings, numbers, booleans, and arrays or documents of them.
+    Their BSON bytes are converted to JSON directly by python-bsonjs when it
+    is installed, so no Python objects are built for their fields; the other
+    keys are serialized like TrustedJSONResponse.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Dict[str, Any]) -> bytes:
+        parts = [b'{"data":[', b",".join([encode_raw_bson(row.raw) for row in content["data"]]), b"]"]
+        for key, value in content.items():
+            if key != "data":
+                parts.append(b"," + _value_adapter.dump_json(key) + b":" + _value_adapter.dump_json(value))
+        parts.append(b"}")
+        return b"".join(parts)
@@ -0,0 +1,172 @@
+"""
+Adaptive admission control middleware
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Pattern, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.metrics import metrics
+from app.middleware.routes import compile_route
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limiter whose limit adapts to observed latency (AIMD).
+
+    The limit grows by 1/limit for every fast response while the limiter is
+    in use, and is cut by backoff_ratio when responses are slower than the
+    latency target, at most once per target interval. Requests that cannot
+    get a slot within max_queue_wait seconds are rejected.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_limit: int,
+        min_limit: int,
+        latency_target: float,
+        max_queue_wait: float,
+        backoff_ratio: float = 0.9
+    ):
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.latency_target = latency_target
+        self.max_queue_wait = max_queue_wait
+        self.backoff_ratio = backoff_ratio
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self._publish()
+
+    async def acquire(self) -> Optional[str]:
+        """Wait for a slot; returns None when admitted or the reason for shedding"""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self._publish()
+            return None
+
+        # The queue is bounded by the limit, so a full queue means the
+        # wait would almost certainly exceed the target anyway
+        if len(self._waiters) >= int(self.limit):
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        try:
+            await asyncio.wait_for(waiter, self.max_queue_wait)
+            return None
+        except asyncio.TimeoutError:
+            return "queue_timeout"
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before cancellation
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._publish()
+
+    def release(self, latency: float):
+        """Return a slot and adapt the limit to the request latency"""
+        if latency > self.latency_target:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self._last_decrease = now
+        elif self.in_flight * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._release_slot()
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+        self._publish()
+
+    def _publish(self):
+        metrics.set("admission_limit", self.limit, route=self.name)
+        metrics.set("admission_in_flight", self.in_flight, route=self.name)
+        metrics.set("admission_queue_length", len(self._waiters), route=self.name)
+
+
+class AdmissionControlMiddleware:
+    """
+    Per-route admission control with load shedding.
+
+    Each configured route ("METHOD /path/{param}") gets its own adaptive
+    limiter. Requests to other routes, such as /health, are never queued.
+    Shed requests get 503 with a Retry-After header.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        budgets: Dict[str, int],
+        latency_targets_ms: Dict[str, int],
+        min_limit: int = 4,
+        max_queue_wait_ms: int = 100,
+        retry_after_seconds: int = 1,
+        prefix: str = ""
+    ):
+        self.app = app
+        self.retry_after_seconds = retry_after_seconds
+        self.routes: List[Tuple[str, Pattern, AdaptiveLimiter]] = []
+        for route, budget in budgets.items():
+            method, pattern = compile_route(route, prefix)
+            limiter = AdaptiveLimiter(
+                name=route,
+                max_limit=budget,
+                min_limit=min_limit,
+                latency_target=latency_targets_ms.get(route, 500) / 1000,
+                max_queue_wait=max_queue_wait_ms / 1000
+            )
+            self.routes.append((method, pattern, limiter))
+
+    def _match(self, scope: Scope) -> Optional[AdaptiveLimiter]:
+        method = scope["method"]
+        path = scope["path"]
+        for route_method, pattern, limiter in self.routes:
+            if route_method == method and pattern.match(path):
+                return limiter
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self._match(scope)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        queued_at = time.monotonic()
+        reason = await limiter.acquire()
+        if reason is not None:
+            metrics.inc("admission_shed_total", route=limiter.name, reason=reason)
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please retry later"},
+                headers={"Retry-After": str(self.retry_after_seconds)}
+            )
+            await response(scope, receive, send)
+            return
+
+        metrics.inc("admission_admitted_total", route=limiter.name)
+        started = time.monotonic()
+        metrics.inc("admission_queue_wait_seconds_total", started - queued_at, route=limiter.name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.monotonic() - started)
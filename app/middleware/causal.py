@@ -0,0 +1,40 @@
+"""
+Causal consistency middleware
+"""
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.database import causal_session, encode_causal_token
+
+TOKEN_HEADER = "x-causal-token"
+
+
+class CausalConsistencyMiddleware:
+    """
+    Give write-then-read flows read-your-writes guarantees across requests.
+
+    Each request runs in a causally consistent session. The session's
+    operation time is returned in the X-Causal-Token response header, and a
+    client that sends it back on a later request gets reads that observe
+    everything up to that point, even when they are routed to a secondary.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = Headers(scope=scope).get(TOKEN_HEADER)
+        async with causal_session(token) as session:
+
+            async def send_with_token(message: Message):
+                if message["type"] == "http.response.start":
+                    new_token = encode_causal_token(session)
+                    if new_token is not None:
+                        MutableHeaders(raw=message["headers"])["X-Causal-Token"] = new_token
+                await send(message)
+
+            await self.app(scope, receive, send_with_token)
@@ -0,0 +1,204 @@
+"""
+Response compression middleware
+"""
+import zlib
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into a coding -> q-value map"""
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def select_encoding(header: str) -> Optional[str]:
+    """Pick the best supported encoding, preferring br over gzip on ties"""
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get("*", 0.0)
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = codings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Compressor:
+    """Incremental compressor for one response"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk, flushing so the client can decode it right away"""
+        if self.encoding == "br":
+            output = self._compressor.process(data)
+            return output + (self._compressor.finish() if final else self._compressor.flush())
+        output = self._compressor.compress(data)
+        return output + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies with br or gzip, negotiated from Accept-Encoding.
+
+    Bodies smaller than minimum_size are sent as-is. Streaming responses are
+    buffered only until minimum_size is reached and then compressed chunk by
+    chunk. Chunks of offload_size bytes or more are compressed in the thread
+    pool so large pages don't block the event loop.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        offload_size: int = 64 * 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request send wrapper that decides whether and how to compress"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+        self.buffer = bytearray()
+
+    async def send(self, message: Message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                message["status"] < 200
+                or message["status"] in (204, 304)
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if not self.passthrough:
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            return
+
+        if message_type != "http.response.body":
+            await self.downstream(message)
+            return
+
+        if self.passthrough:
+            await self._flush_start()
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            await self.downstream({
+                "type": "http.response.body",
+                "body": await self._compress(body, final=not more_body),
+                "more_body": more_body
+            })
+            return
+
+        self.buffer.extend(body)
+        if len(self.buffer) < self.middleware.minimum_size:
+            if more_body:
+                return
+            # Finished under the threshold, send it untouched
+            await self._flush_start()
+            await self.downstream({"type": "http.response.body", "body": bytes(self.buffer)})
+            return
+
+        self.compressor = _Compressor(
+            self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+        )
+        data = bytes(self.buffer)
+        self.buffer = bytearray()
+        compressed = await self._compress(data, final=not more_body)
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(compressed))
+
+        await self._flush_start()
+        await self.downstream({
+            "type": "http.response.body",
+            "body": compressed,
+            "more_body": more_body
+        })
+
+    async def _compress(self, data: bytes, final: bool) -> bytes:
+        if len(data) >= self.middleware.offload_size:
+            return await run_in_threadpool(self.compressor.compress, data, final)
+        return self.compressor.compress(data, final)
+
+    async def _flush_start(self):
+        if self.start_message is not None:
+            message, self.start_message = self.start_message, None
+            await self.downstream(message)
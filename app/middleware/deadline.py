@@ -0,0 +1,110 @@
+"""
+Request deadline and client disconnect middleware
+"""
+import asyncio
+import logging
+from typing import Dict, List, Pattern, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.deadline import reset_deadline, set_deadline
+from app.core.metrics import metrics
+from app.middleware.routes import compile_route
+
+TIMEOUT_HEADER = "x-request-timeout-ms"
+
+
+class DeadlineMiddleware:
+    """
+    Give every request a deadline and cancel it when the client goes away.
+
+    The timeout comes from the per-route configuration, or default_timeout_ms
+    for other routes, and a client may override it with the
+    X-Request-Timeout-Ms header up to max_timeout_ms. Repositories read the
+    remaining budget through app.core.deadline and pass it to MongoDB as
+    maxTimeMS.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        timeouts_ms: Dict[str, int],
+        default_timeout_ms: int = 10000,
+        max_timeout_ms: int = 30000,
+        prefix: str = ""
+    ):
+        self.app = app
+        self.default_timeout_ms = default_timeout_ms
+        self.max_timeout_ms = max_timeout_ms
+        self.routes: List[Tuple[str, Pattern, str, int]] = []
+        for route, timeout_ms in timeouts_ms.items():
+            method, pattern = compile_route(route, prefix)
+            self.routes.append((method, pattern, route, timeout_ms))
+        self.logger = logging.getLogger(__name__)
+
+    def _timeout_for(self, scope: Scope) -> Tuple[str, int]:
+        route_name, timeout_ms = "other", self.default_timeout_ms
+        for method, pattern, name, route_timeout_ms in self.routes:
+            if method == scope["method"] and pattern.match(scope["path"]):
+                route_name, timeout_ms = name, route_timeout_ms
+                break
+
+        override = Headers(scope=scope).get(TIMEOUT_HEADER)
+        if override is not None and override.isdigit() and int(override) > 0:
+            timeout_ms = min(int(override), self.max_timeout_ms)
+        return route_name, timeout_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_name, timeout_ms = self._timeout_for(scope)
+        token = set_deadline(timeout_ms / 1000)
+        try:
+            await self._run(scope, receive, send, route_name)
+        finally:
+            reset_deadline(token)
+
+    async def _run(self, scope: Scope, receive: Receive, send: Send, route_name: str):
+        # The watcher below is the only reader of the real receive channel,
+        # so it notices a disconnect even when the app never reads the body
+        messages: asyncio.Queue = asyncio.Queue()
+        response_complete = False
+
+        async def app_receive() -> Message:
+            return await messages.get()
+
+        async def app_send(message: Message):
+            nonlocal response_complete
+            if message["type"] == "http.response.start" and message["status"] == 504:
+                metrics.inc("request_deadline_exceeded_total", route=route_name)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        app_task = asyncio.ensure_future(self.app(scope, app_receive, app_send))
+        disconnected = False
+
+        async def watch_disconnect():
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    if not response_complete and not app_task.done():
+                        disconnected = True
+                        app_task.cancel()
+                    return
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+            metrics.inc("request_client_disconnects_total", route=route_name)
+            self.logger.info(f"Client disconnected, cancelled {scope['method']} {scope['path']}")
+        finally:
+            watcher.cancel()
@@ -0,0 +1,112 @@
+"""
+Opt-in request profiling middleware
+"""
+import hashlib
+import hmac
+import logging
+import random
+import time
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import metrics
+from app.core.profiling import ProfileRing, RequestProfile, run_profiled
+
+PROFILE_HEADER = "x-profile"
+
+
+def sign_profile_request(secret: str, method: str, path: str, expires: int) -> str:
+    """X-Profile header value that enables profiling of one route until expires"""
+    message = f"{expires}:{method}:{path}".encode()
+    signature = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request when asked to with a signed header, or at random.
+
+    A request is profiled when it carries an X-Profile header produced by
+    sign_profile_request with the shared secret and not yet expired, or with
+    probability sample_rate. The profile's stacks are written in collapsed
+    format to a bounded ring of files in directory, and the time split
+    between running on the event loop, waiting for MongoDB and waiting for
+    the event loop is returned in the Server-Timing response header.
+
+    Stacks are sampled only from this request's own task, so add this
+    middleware closest to the router, inside anything that runs the app in
+    a separate task.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str,
+        secret: str = "",
+        sample_rate: float = 0.0,
+        interval_ms: float = 5.0,
+        max_files: int = 100
+    ):
+        self.app = app
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.interval_ms = interval_ms
+        self.ring = ProfileRing(directory, max_files)
+        self.logger = logging.getLogger(__name__)
+
+    def _trigger(self, scope: Scope) -> str:
+        """Why this request should be profiled; empty when it should not be"""
+        header = Headers(scope=scope).get(PROFILE_HEADER)
+        if header is not None and self.secret:
+            expires, _, _ = header.partition(".")
+            if expires.isdigit() and int(expires) >= time.time():
+                expected = sign_profile_request(self.secret, scope["method"], scope["path"], int(expires))
+                if hmac.compare_digest(header, expected):
+                    return "header"
+            self.logger.warning(f"Ignoring invalid X-Profile header for {scope['method']} {scope['path']}")
+
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return ""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = self._trigger(scope)
+        if not trigger:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(f"{scope['method']} {scope['path']}", self.interval_ms)
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"]).append(
+                    "Server-Timing",
+                    f"cpu;dur={profile.cpu_time * 1000:.1f}, "
+                    f"mongo;dur={profile.mongo_time * 1000:.1f}, "
+                    f"loop;dur={profile.loop_wait_time * 1000:.1f}"
+                )
+            await send(message)
+
+        try:
+            await run_profiled(self.app(scope, receive, send_with_timing), profile)
+        finally:
+            metrics.inc("requests_profiled_total", trigger=trigger)
+            await self._save(profile)
+
+    async def _save(self, profile: RequestProfile):
+        try:
+            path = await run_in_threadpool(self.ring.write, profile)
+        except OSError as e:
+            self.logger.error(f"Failed to write profile of {profile.name}: {e}")
+            return
+        self.logger.info(
+            f"Profiled {profile.name} in {profile.wall_time * 1000:.1f}ms "
+            f"(cpu {profile.cpu_time * 1000:.1f}ms, mongo {profile.mongo_time * 1000:.1f}ms, "
+            f"event loop wait {profile.loop_wait_time * 1000:.1f}ms): {path}"
+        )
@@ -0,0 +1,13 @@
+"""
+Route matching helpers for middleware
+"""
+import re
+from typing import Pattern, Tuple
+
+
+def compile_route(route: str, prefix: str = "") -> Tuple[str, Pattern]:
+    """Turn "GET /orders/{user_id}" into a method and a path regex"""
+    method, _, path = route.partition(" ")
+    parts = re.split(r"\{[^/]+\}", prefix + path)
+    pattern = "[^/]+".join(re.escape(part) for part in parts)
+    return method.upper(), re.compile(f"^{pattern}/?$")
@@ -3,8 +3,7 @@ Order data models and schemas
 """
 from typing import List, Optional
 from datetime import datetime
-from pydantic import BaseModel, Field
-from bson import ObjectId
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.product import PyObjectId
 
@@ -18,7 +17,7 @@ class OrderItem(BaseModel):
 class OrderCreate(BaseModel):
     """Order creation schema"""
     userId: str = Field(..., description="User ID")
-    items: List[OrderItem] = Field(..., min_items=1, description="Order items")
+    items: List[OrderItem] = Field(..., min_length=1, description="Order items")
 
 
 class ProductDetails(BaseModel):
@@ -54,7 +53,4 @@ class OrderInDB(BaseModel):
     total: float
     createdAt: datetime = Field(default_factory=datetime.utcnow)
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True)
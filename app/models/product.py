@@ -1,11 +1,14 @@
 """
 Product data models and schemas
 """
+from enum import Enum
 from typing import List, Optional
-from pydantic import BaseModel, Field, GetCoreSchemaHandler
+from pydantic import BaseModel, ConfigDict, Field, GetCoreSchemaHandler
 from pydantic_core import core_schema
 from bson import ObjectId
 
+OBJECT_ID_PATTERN = r"^[0-9a-fA-F]{24}$"
+
 
 class PyObjectId(ObjectId):
     """Custom ObjectId support for Pydantic v2"""
@@ -14,15 +17,22 @@ class PyObjectId(ObjectId):
     def __get_pydantic_core_schema__(
         cls, source_type: type, handler: GetCoreSchemaHandler
     ) -> core_schema.CoreSchema:
-        return core_schema.no_info_plain_validator_function(cls.validate)
-
-    @classmethod
-    def validate(cls, v):
-        if isinstance(v, ObjectId):
-            return v
-        if isinstance(v, str) and ObjectId.is_valid(v):
-            return ObjectId(v)
-        raise TypeError("Invalid ObjectId")
+        # Hex strings are checked by the compiled pattern validator, so the
+        # Python ObjectId constructor only runs on input that is known valid
+        from_str = core_schema.chain_schema([
+            core_schema.str_schema(pattern=OBJECT_ID_PATTERN),
+            core_schema.no_info_plain_validator_function(ObjectId),
+        ])
+        return core_schema.json_or_python_schema(
+            json_schema=from_str,
+            python_schema=core_schema.union_schema([
+                core_schema.is_instance_schema(ObjectId),
+                from_str,
+            ]),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                str, when_used="json"
+            ),
+        )
 
 
 class Size(BaseModel):
@@ -31,6 +41,14 @@ class Size(BaseModel):
     quantity: int = Field(..., ge=0, description="Available quantity")
 
 
+class ProductSort(str, Enum):
+    """Supported product listing orders"""
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+    NAME_ASC = "name_asc"
+    NAME_DESC = "name_desc"
+
+
 class ProductCreate(BaseModel):
     """Product creation schema"""
     name: str = Field(..., min_length=1, max_length=200, description="Product name")
@@ -38,17 +56,47 @@ class ProductCreate(BaseModel):
     sizes: List[Size] = Field(..., description="Available sizes and quantities")
 
 
+class SizeAvailability(BaseModel):
+    """Whether a product size is in stock"""
+    size: str = Field(..., description="Size name")
+    inStock: bool = Field(..., description="Whether the size has quantity available")
+
+
 class ProductResponse(BaseModel):
     """Product response schema"""
     id: str = Field(..., description="Product ID")
     name: str = Field(..., description="Product name")
     price: float = Field(..., description="Product price")
+    availability: Optional[List[SizeAvailability]] = Field(
+        None, description="Per-size availability, included for in-stock listings"
+    )
+
+
+class ProductDetailResponse(BaseModel):
+    """Product detail response schema"""
+    id: str = Field(..., description="Product ID")
+    name: str = Field(..., description="Product name")
+    price: float = Field(..., description="Product price")
+    sizes: List[Size] = Field(..., description="Available sizes and quantities")
+
+
+class SizeFacet(BaseModel):
+    """Number of products available in a size"""
+    size: str = Field(..., description="Size name")
+    count: int = Field(..., description="Number of matching products with this size")
+
+
+class ProductFacets(BaseModel):
+    """Facet counts for a product listing"""
+    total: int = Field(..., description="Total number of matching products")
+    sizes: List[SizeFacet]
 
 
 class ProductListResponse(BaseModel):
     """Product list response schema"""
     data: List[ProductResponse]
     page: dict
+    facets: Optional[ProductFacets] = None
 
 
 class ProductInDB(BaseModel):
@@ -58,7 +106,4 @@ class ProductInDB(BaseModel):
     price: float
     sizes: List[Size]
 
-    class Config:
-        populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True)
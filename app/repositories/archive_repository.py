@@ -0,0 +1,100 @@
+"""
+Order archive repository for database operations
+"""
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from bson import ObjectId
+from pymongo import ReplaceOne
+from pymongo.errors import PyMongoError
+
+from app.core.database import get_database
+from app.core.exceptions import DatabaseError
+
+ARCHIVE_COLLECTION = "orders_archive"
+CHECKPOINT_COLLECTION = "archive_checkpoints"
+CHECKPOINT_ID = "orders"
+
+
+class ArchiveRepository:
+    """Order archive repository class"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    async def get_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Get the archival checkpoint"""
+        try:
+            db = await get_database()
+            return await db[CHECKPOINT_COLLECTION].find_one({"_id": CHECKPOINT_ID})
+
+        except PyMongoError as e:
+            self.logger.error(f"Failed to get archive checkpoint: {e}")
+            raise DatabaseError("Failed to retrieve archive checkpoint")
+
+    async def save_checkpoint(
+        self,
+        cutoff: datetime,
+        last_id: Optional[ObjectId],
+        archived: int,
+        completed: bool
+    ):
+        """Save the archival checkpoint"""
+        try:
+            db = await get_database()
+            await db[CHECKPOINT_COLLECTION].replace_one(
+                {"_id": CHECKPOINT_ID},
+                {
+                    "cutoff": cutoff,
+                    "lastId": last_id,
+                    "archived": archived,
+                    "completed": completed,
+                    "updatedAt": datetime.utcnow()
+                },
+                upsert=True
+            )
+
+        except PyMongoError as e:
+            self.logger.error(f"Failed to save archive checkpoint: {e}")
+            raise DatabaseError("Failed to save archive checkpoint")
+
+    async def get_archivable_orders(
+        self,
+        cutoff: datetime,
+        after_id: Optional[ObjectId],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Get the next batch of orders created before the cutoff, in _id order"""
+        try:
+            db = await get_database()
+
+            query_filter: Dict[str, Any] = {"createdAt": {"$lt": cutoff}}
+            if after_id is not None:
+                query_filter["_id"] = {"$gt": after_id}
+
+            cursor = db.orders.find(query_filter).sort("_id", 1).limit(limit)
+            return await cursor.to_list(length=limit)
+
+        except PyMongoError as e:
+            self.logger.error(f"Failed to get archivable orders: {e}")
+            raise DatabaseError("Failed to retrieve archivable orders")
+
+    async def move_to_archive(self, orders: List[Dict[str, Any]]) -> int:
+        """Copy orders into the archive, then remove them from the hot collection"""
+        try:
+            db = await get_database()
+
+            # Replacing by _id makes the copy idempotent, so a batch that was
+            # interrupted after the copy can safely be moved again
+            await db[ARCHIVE_COLLECTION].bulk_write(
+                [ReplaceOne({"_id": order["_id"]}, order, upsert=True) for order in orders],
+                ordered=False
+            )
+            result = await db.orders.delete_many(
+                {"_id": {"$in": [order["_id"] for order in orders]}}
+            )
+            return result.deleted_count
+
+        except PyMongoError as e:
+            self.logger.error(f"Failed to move orders to archive: {e}")
+            raise DatabaseError("Failed to archive orders")
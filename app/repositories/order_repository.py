@@ -5,11 +5,14 @@ import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from bson import ObjectId
-from pymongo.errors import PyMongoError
+from pymongo.errors import ExecutionTimeout, PyMongoError
 
-from app.core.database import get_database
-from app.core.exceptions import DatabaseError
+from app.core.database import get_database, get_session
+from app.core.deadline import max_time_ms
+from app.core.exceptions import DatabaseError, RequestTimeoutError
+from app.core.metrics import metrics
 from app.models.order import OrderCreate
+from app.repositories.archive_repository import ARCHIVE_COLLECTION
 
 
 class OrderRepository:
@@ -25,12 +28,12 @@ class OrderRepository:
             
             order_dict = {
                 "userId": order_data.userId,
-                "items": [item.dict() for item in order_data.items],
+                "items": [item.model_dump() for item in order_data.items],
                 "total": total,
                 "createdAt": datetime.utcnow()
             }
             
-            result = await db.orders.insert_one(order_dict)
+            result = await db.orders.insert_one(order_dict, session=get_session())
             
             self.logger.info(f"Order created with ID: {result.inserted_id}")
             return str(result.inserted_id)
@@ -45,77 +48,11 @@ class OrderRepository:
         limit: int = 10,
         offset: int = 0
     ) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
-        """Get orders for a specific user with pagination"""
+        """Get orders for a specific user with pagination, newest first"""
         try:
-            db = await get_database()
-            
-            # Build aggregation pipeline
-            pipeline = [
-                {"$match": {"userId": user_id}},
-                {"$sort": {"_id": 1}},
-                {"$skip": offset},
-                {"$limit": limit},
-                {
-                    "$lookup": {
-                        "from": "products",
-                        "let": {"item_ids": "$items.productId"},
-                        "pipeline": [
-                            {
-                                "$match": {
-                                    "$expr": {
-                                        "$in": [{"$toString": "$_id"}, "$$item_ids"]
-                                    }
-                                }
-                            },
-                            {
-                                "$project": {
-                                    "_id": 1,
-                                    "name": 1,
-                                    "price": 1
-                                }
-                            }
-                        ],
-                        "as": "productDetails"
-                    }
-                }
-            ]
-            
-            # Execute aggregation
-            cursor = db.orders.aggregate(pipeline)
-            orders = await cursor.to_list(length=limit)
-            
-            # Get total count for pagination
-            total_count = await db.orders.count_documents({"userId": user_id})
-            
-            # Format response
-            formatted_orders = []
-            for order in orders:
-                # Create product lookup map
-                product_map = {}
-                for product in order.get("productDetails", []):
-                    product_map[str(product["_id"])] = {
-                        "id": str(product["_id"]),
-                        "name": product["name"]
-                    }
-                
-                # Format order items with product details
-                formatted_items = []
-                for item in order["items"]:
-                    product_details = product_map.get(item["productId"], {
-                        "id": item["productId"],
-                        "name": "Unknown Product"
-                    })
-                    
-                    formatted_items.append({
-                        "productDetails": product_details,
-                        "qty": item["qty"]
-                    })
-                
-                formatted_orders.append({
-                    "id": str(order["_id"]),
-                    "items": formatted_items,
-                    "total": order["total"]
-                })
+            formatted_orders, total_count = await self._read_history(
+                "OrderRepository.get_user_orders", user_id, limit, offset
+            )
             
             # Calculate pagination info
             next_offset = offset + limit if offset + limit < total_count else None
@@ -130,6 +67,150 @@ class OrderRepository:
             self.logger.info(f"Retrieved {len(formatted_orders)} orders for user {user_id}")
             return formatted_orders, page_info
             
+        except ExecutionTimeout as e:
+            self.logger.warning(f"Query exceeded request deadline: {e}")
+            raise RequestTimeoutError("Retrieving orders timed out")
         except PyMongoError as e:
             self.logger.error(f"Failed to get user orders: {e}")
             raise DatabaseError("Failed to retrieve orders")
+    
+    async def get_recent_orders(self, user_id: str, limit: int) -> tuple[List[Dict[str, Any]], int]:
+        """
+        Get a user's newest orders and their total number of orders
+
+        These fill the order history cache, so they are read with this
+        method's own read preference (the primary unless configured) rather
+        than from a possibly stale secondary.
+        """
+        try:
+            return await self._read_history("OrderRepository.get_recent_orders", user_id, limit, 0)
+            
+        except ExecutionTimeout as e:
+            self.logger.warning(f"Query exceeded request deadline: {e}")
+            raise RequestTimeoutError("Retrieving orders timed out")
+        except PyMongoError as e:
+            self.logger.error(f"Failed to get recent orders: {e}")
+            raise DatabaseError("Failed to retrieve orders")
+    
+    async def _read_history(
+        self,
+        operation: str,
+        user_id: str,
+        limit: int,
+        offset: int
+    ) -> tuple[List[Dict[str, Any]], int]:
+        """
+        Read a page of formatted orders and the user's total order count
+
+        Recent orders live in the hot collection and older ones in the
+        archive, so the archive is only queried when the requested page
+        reaches past the user's hot orders. operation picks the read
+        preference, as for get_database.
+        """
+        db = await get_database(operation)
+        
+        # Get hot count for pagination
+        hot_count = await db.orders.count_documents(
+            {"userId": user_id},
+            session=get_session(),
+            **max_time_ms()
+        )
+        
+        orders = []
+        if offset < hot_count:
+            orders = await self._fetch_orders(db.orders, user_id, offset, limit)
+            metrics.inc("order_history_reads_total", source="hot")
+        
+        total_count = hot_count
+        if offset + limit >= hot_count:
+            archive = db[ARCHIVE_COLLECTION]
+            archive_count = await archive.count_documents(
+                {"userId": user_id},
+                session=get_session(),
+                **max_time_ms()
+            )
+            total_count += archive_count
+            
+            archive_offset = max(0, offset - hot_count)
+            archive_limit = limit - len(orders)
+            if archive_limit > 0 and archive_offset < archive_count:
+                orders += await self._fetch_orders(archive, user_id, archive_offset, archive_limit)
+            metrics.inc("order_history_reads_total", source="archive")
+        
+        return self._format_orders(orders), total_count
+    
+    async def _fetch_orders(
+        self,
+        collection,
+        user_id: str,
+        offset: int,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Fetch a page of a user's orders with product details from one collection"""
+        # Build aggregation pipeline
+        pipeline = [
+            {"$match": {"userId": user_id}},
+            {"$sort": {"_id": -1}},
+            {"$skip": offset},
+            {"$limit": limit},
+            {
+                "$lookup": {
+                    "from": "products",
+                    "let": {"item_ids": "$items.productId"},
+                    "pipeline": [
+                        {
+                            "$match": {
+                                "$expr": {
+                                    "$in": [{"$toString": "$_id"}, "$$item_ids"]
+                                }
+                            }
+                        },
+                        {
+                            "$project": {
+                                "_id": 1,
+                                "name": 1,
+                                "price": 1
+                            }
+                        }
+                    ],
+                    "as": "productDetails"
+                }
+            }
+        ]
+        
+        # Execute aggregation
+        cursor = collection.aggregate(pipeline, session=get_session(), **max_time_ms())
+        return await cursor.to_list(length=limit)
+    
+    def _format_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Format orders with product details for the response"""
+        formatted_orders = []
+        for order in orders:
+            # Create product lookup map
+            product_map = {}
+            for product in order.get("productDetails", []):
+                product_map[str(product["_id"])] = {
+                    "id": str(product["_id"]),
+                    "name": product["name"]
+                }
+            
+            # Format order items with product details
+            formatted_items = []
+            for item in order["items"]:
+                product_details = product_map.get(item["productId"], {
+                    "id": item["productId"],
+                    "name": "Unknown Product"
+                })
+                
+                formatted_items.append({
+                    "productDetails": product_details,
+                    "qty": item["qty"]
+                })
+            
+            formatted_orders.append({
+                "id": str(order["_id"]),
+                "items": formatted_items,
+                "total": order["total"]
+            })
+        
+        return formatted_orders
@@ -1,19 +1,49 @@
 """
 Product repository for database operations
 """
+import base64
+import json
 import logging
-from typing import List, Optional, Dict, Any
+import time
+from typing import List, Mapping, Optional, Dict, Any
 from bson import ObjectId
-from pymongo.errors import PyMongoError
+from bson.codec_options import CodecOptions
+from bson.errors import InvalidId
+from bson.raw_bson import RawBSONDocument
+from pymongo.errors import ExecutionTimeout, PyMongoError
 
-from app.core.database import get_database
-from app.core.exceptions import DatabaseError, NotFoundError
-from app.models.product import ProductCreate, ProductInDB
+from app.core.config import settings
+from app.core.database import IN_STOCK_FILTER, PRODUCT_LISTING_INDEXES, get_database, get_session
+from app.core.deadline import max_time_ms, remaining_ms
+from app.core.exceptions import DatabaseError, NotFoundError, RequestTimeoutError, ValidationError
+from app.models.product import ProductCreate
+
+# Listing rows in their response form, so they need no reshaping in Python
+PRODUCT_ROW_FIELDS = {"id": {"$toString": "$_id"}, "name": "$name", "price": "$price"}
+PRODUCT_ROW_STAGE = {"$replaceWith": PRODUCT_ROW_FIELDS}
+
+# In-stock listings also show which sizes are available
+PRODUCT_AVAILABILITY_ROW_STAGE = {
+    "$replaceWith": {
+        **PRODUCT_ROW_FIELDS,
+        "availability": {
+            "$map": {
+                "input": "$sizes",
+                "in": {"size": "$$this.size", "inStock": {"$gt": ["$$this.quantity", 0]}}
+            }
+        }
+    }
+}
+
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
 
 
 class ProductRepository:
     """Product repository class"""
     
+    # (expires_at, facets) for the unfiltered catalog, shared across instances
+    _facets_cache: Optional[tuple[float, Dict[str, Any]]] = None
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
     
@@ -22,8 +52,10 @@ class ProductRepository:
         try:
             db = await get_database()
             
-            product_dict = product_data.dict()
-            result = await db.products.insert_one(product_dict)
+            product_dict = product_data.model_dump()
+            result = await db.products.insert_one(product_dict, session=get_session())
+            
+            ProductRepository._facets_cache = None
             
             self.logger.info(f"Product created with ID: {result.inserted_id}")
             return str(result.inserted_id)
@@ -37,11 +69,39 @@ class ProductRepository:
         name: Optional[str] = None,
         size: Optional[str] = None,
         limit: int = 10,
-        offset: int = 0
-    ) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
-        """Get products with filtering and pagination"""
+        offset: int = 0,
+        facets: bool = False,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        sort: Optional[str] = None,
+        cursor: Optional[str] = None,
+        raw: bool = False,
+        in_stock: bool = False
+    ) -> tuple[List[Mapping[str, Any]], Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Get products with filtering, sorting and pagination
+
+        Results are ordered by the sort field with _id as a tiebreaker (by _id
+        alone without a sort), and every query is hinted to the matching
+        listing index so the order comes from the index rather than an
+        in-memory sort. A cursor token continues after the last product of
+        the previous page, which stays cheap on deep pages, and replaces the
+        offset.
+
+        With facets, the total and per-size counts for the whole result set
+        are computed in the same $facet aggregation as the page. Facets for
+        the unfiltered catalog are cached for a short time.
+
+        With in_stock, only products with quantity available are listed (in
+        the given size, when filtering by size), and rows include per-size
+        availability.
+
+        Rows are shaped into their response form by the server. With raw,
+        they are returned as RawBSONDocuments for RawBSONListResponse.
+        """
         try:
-            db = await get_database()
+            db = await get_database("ProductRepository.get_products")
+            collection = db.products.with_options(codec_options=RAW_CODEC_OPTIONS) if raw else db.products
             
             # Build query filter
             query_filter = {}
@@ -49,42 +109,205 @@ class ProductRepository:
             if name:
                 query_filter["name"] = {"$regex": name, "$options": "i"}
             
-            if size:
+            if size and in_stock:
+                # Size and quantity must match on the same array element
+                query_filter["sizes"] = {"$elemMatch": {"size": size, "quantity": {"$gt": 0}}}
+            elif size:
                 query_filter["sizes.size"] = size
+            elif in_stock:
+                query_filter.update(IN_STOCK_FILTER)
             
-            # Get total count for pagination
-            total_count = await db.products.count_documents(query_filter)
+            if min_price is not None or max_price is not None:
+                query_filter["price"] = {}
+                if min_price is not None:
+                    query_filter["price"]["$gte"] = min_price
+                if max_price is not None:
+                    query_filter["price"]["$lte"] = max_price
             
-            # Execute query with pagination
-            cursor = db.products.find(query_filter).skip(offset).limit(limit)
-            products = await cursor.to_list(length=limit)
+            sort_field, direction = self._parse_sort(sort)
+            sort_spec = [(sort_field, direction)]
+            if sort_field != "_id":
+                sort_spec.append(("_id", direction))
+            hint = PRODUCT_LISTING_INDEXES[(bool(size), in_stock, sort_field)]
+            row_stage = PRODUCT_AVAILABILITY_ROW_STAGE if in_stock else PRODUCT_ROW_STAGE
             
-            # Convert ObjectId to string and format response
-            formatted_products = []
-            for product in products:
-                formatted_products.append({
-                    "id": str(product["_id"]),
-                    "name": product["name"],
-                    "price": product["price"]
-                })
+            page_filter = query_filter
+            if cursor is not None:
+                offset = 0
+                page_filter = {"$and": [query_filter, self._after_cursor(cursor, sort, sort_field, direction)]}
+            
+            facet_counts = None
+            if facets:
+                facet_counts = self._cached_facets(query_filter)
+            
+            if facets and facet_counts is None:
+                products, facet_counts = await self._get_products_with_facets(
+                    collection, query_filter, page_filter, sort_spec, hint, row_stage, in_stock,
+                    limit, offset
+                )
+                total_count = facet_counts["total"]
+                if not query_filter:
+                    ProductRepository._facets_cache = (
+                        time.monotonic() + settings.PRODUCT_FACETS_TTL_SECONDS,
+                        facet_counts
+                    )
+            else:
+                if facet_counts is not None:
+                    total_count = facet_counts["total"]
+                elif cursor is None:
+                    # Get total count for pagination
+                    total_count = await db.products.count_documents(
+                        query_filter,
+                        session=get_session(),
+                        **max_time_ms()
+                    )
+                else:
+                    total_count = None
+                
+                # Execute query with pagination, fetching one extra product
+                # to tell whether a cursor page is the last one
+                pipeline = [
+                    {"$match": page_filter},
+                    {"$sort": dict(sort_spec)},
+                    {"$skip": offset},
+                    {"$limit": limit + 1},
+                    row_stage
+                ]
+                rows_cursor = collection.aggregate(
+                    pipeline, hint=hint, session=get_session(), **max_time_ms()
+                )
+                products = await rows_cursor.to_list(length=limit + 1)
+            
+            has_more = len(products) > limit
+            products = products[:limit]
             
             # Calculate pagination info
-            next_offset = offset + limit if offset + limit < total_count else None
-            previous_offset = max(0, offset - limit) if offset > 0 else None
+            if cursor is None:
+                next_offset = offset + limit if offset + limit < total_count else None
+                previous_offset = max(0, offset - limit) if offset > 0 else None
+            else:
+                next_offset = previous_offset = None
             
             page_info = {
                 "next": str(next_offset) if next_offset is not None else None,
-                "limit": len(formatted_products),
-                "previous": str(previous_offset) if previous_offset is not None else None
+                "limit": len(products),
+                "previous": str(previous_offset) if previous_offset is not None else None,
+                "cursor": self._encode_cursor(sort, sort_field, products[-1]) if has_more else None
             }
             
-            self.logger.info(f"Retrieved {len(formatted_products)} products")
-            return formatted_products, page_info
+            self.logger.info(f"Retrieved {len(products)} products")
+            return products, page_info, facet_counts
             
+        except ExecutionTimeout as e:
+            self.logger.warning(f"Query exceeded request deadline: {e}")
+            raise RequestTimeoutError("Retrieving products timed out")
         except PyMongoError as e:
             self.logger.error(f"Failed to get products: {e}")
             raise DatabaseError("Failed to retrieve products")
     
+    @staticmethod
+    def _parse_sort(sort: Optional[str]) -> tuple[str, int]:
+        """Sort field and direction for a listing order such as price_desc"""
+        if sort is None:
+            return "_id", 1
+        field, order = sort.rsplit("_", 1)
+        return field, -1 if order == "desc" else 1
+    
+    @staticmethod
+    def _encode_cursor(sort: Optional[str], sort_field: str, product: Mapping[str, Any]) -> str:
+        """Opaque token holding the sort key of the last product on a page"""
+        token = {"sort": sort, "id": product["id"]}
+        if sort_field != "_id":
+            token["value"] = product[sort_field]
+        return base64.urlsafe_b64encode(json.dumps(token).encode()).decode()
+    
+    @staticmethod
+    def _after_cursor(
+        cursor: str,
+        sort: Optional[str],
+        sort_field: str,
+        direction: int
+    ) -> Dict[str, Any]:
+        """Filter for the products that follow a cursor in the listing order"""
+        try:
+            token = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            last_id = ObjectId(token["id"])
+            value = token.get("value")
+        except (ValueError, TypeError, KeyError, InvalidId):
+            raise ValidationError("Invalid cursor")
+        if token.get("sort") != sort:
+            raise ValidationError("Cursor was issued for a different sort order")
+        
+        after = "$gt" if direction == 1 else "$lt"
+        if sort_field == "_id":
+            return {"_id": {after: last_id}}
+        # The inclusive bound on the sort field keeps the index scan tight;
+        # the $or then skips the products up to the last one
+        return {
+            sort_field: {after + "e": value},
+            "$or": [{sort_field: {after: value}}, {"_id": {after: last_id}}]
+        }
+    
+    def _cached_facets(self, query_filter: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cached facets, only kept for the unfiltered catalog"""
+        if query_filter or ProductRepository._facets_cache is None:
+            return None
+        
+        expires_at, facet_counts = ProductRepository._facets_cache
+        if expires_at <= time.monotonic():
+            return None
+        return facet_counts
+    
+    async def _get_products_with_facets(
+        self,
+        collection,
+        query_filter: Dict[str, Any],
+        page_filter: Dict[str, Any],
+        sort_spec: List[tuple[str, int]],
+        hint: List[tuple[str, int]],
+        row_stage: Dict[str, Any],
+        in_stock: bool,
+        limit: int,
+        offset: int
+    ) -> tuple[List[Mapping[str, Any]], Dict[str, Any]]:
+        """Get a page, the total and per-size counts in one aggregation"""
+        # The leading $match and $sort use the listing index; the facets then
+        # share its ordered result set, and only the page honours the cursor
+        data = [{"$skip": offset}, {"$limit": limit + 1}, row_stage]
+        if page_filter is not query_filter:
+            data.insert(0, {"$match": page_filter})
+        # In-stock listings count only the sizes that are available
+        sizes = [{"$unwind": "$sizes"}]
+        if in_stock:
+            sizes.append({"$match": IN_STOCK_FILTER})
+        sizes += [
+            {"$group": {"_id": "$sizes.size", "count": {"$sum": 1}}},
+            {"$sort": {"_id": 1}}
+        ]
+        pipeline = [
+            {"$match": query_filter},
+            {"$sort": dict(sort_spec)},
+            {
+                "$facet": {
+                    "data": data,
+                    "total": [{"$count": "count"}],
+                    "sizes": sizes
+                }
+            }
+        ]
+        
+        cursor = collection.aggregate(pipeline, hint=hint, session=get_session(), **max_time_ms())
+        result = (await cursor.to_list(length=1))[0]
+        
+        facet_counts = {
+            "total": result["total"][0]["count"] if result["total"] else 0,
+            "sizes": [
+                {"size": facet["_id"], "count": facet["count"]}
+                for facet in result["sizes"]
+            ]
+        }
+        return result["data"], facet_counts
+    
     async def get_product_by_id(self, product_id: str) -> Optional[Dict[str, Any]]:
         """Get product by ID"""
         try:
@@ -92,7 +315,11 @@ class ProductRepository:
                 return None
                 
             db = await get_database()
-            product = await db.products.find_one({"_id": ObjectId(product_id)})
+            product = await db.products.find_one(
+                {"_id": ObjectId(product_id)},
+                session=get_session(),
+                max_time_ms=remaining_ms()
+            )
             
             if product:
                 product["id"] = str(product["_id"])
@@ -100,6 +327,9 @@ class ProductRepository:
             
             return product
             
+        except ExecutionTimeout as e:
+            self.logger.warning(f"Query exceeded request deadline: {e}")
+            raise RequestTimeoutError("Retrieving product timed out")
         except PyMongoError as e:
             self.logger.error(f"Failed to get product by ID: {e}")
             raise DatabaseError("Failed to retrieve product")
@@ -115,7 +345,10 @@ class ProductRepository:
                 if ObjectId.is_valid(pid):
                     object_ids.append(ObjectId(pid))
             
-            cursor = db.products.find({"_id": {"$in": object_ids}})
+            cursor = db.products.find(
+                {"_id": {"$in": object_ids}},
+                session=get_session()
+            ).max_time_ms(remaining_ms())
             products = await cursor.to_list(length=None)
             
             # Format response
@@ -130,6 +363,9 @@ class ProductRepository:
             
             return formatted_products
             
+        except ExecutionTimeout as e:
+            self.logger.warning(f"Query exceeded request deadline: {e}")
+            raise RequestTimeoutError("Retrieving products timed out")
         except PyMongoError as e:
             self.logger.error(f"Failed to get products by IDs: {e}")
             raise DatabaseError("Failed to retrieve products")
@@ -0,0 +1,73 @@
+"""
+Order archival business logic service
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.repositories.archive_repository import ArchiveRepository
+
+
+class ArchiveService:
+    """Order archival service class"""
+
+    def __init__(self):
+        self.repository = ArchiveRepository()
+        self.logger = logging.getLogger(__name__)
+
+    async def archive_orders(
+        self,
+        older_than_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_batches: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Move orders older than the configured age into the archive in batches
+
+        Progress is checkpointed after every batch. An interrupted run resumes
+        from its checkpoint with its original cutoff; a completed run starts
+        a new pass with a fresh cutoff.
+        """
+        if older_than_days is None:
+            older_than_days = settings.ORDER_ARCHIVE_AFTER_DAYS
+        if batch_size is None:
+            batch_size = settings.ORDER_ARCHIVE_BATCH_SIZE
+
+        checkpoint = await self.repository.get_checkpoint()
+        if checkpoint and not checkpoint["completed"]:
+            cutoff = checkpoint["cutoff"]
+            last_id = checkpoint["lastId"]
+            archived = checkpoint["archived"]
+            self.logger.info(f"Resuming order archival after {last_id} (cutoff {cutoff})")
+        else:
+            cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+            last_id = None
+            archived = 0
+            self.logger.info(f"Starting order archival (cutoff {cutoff})")
+
+        batches = 0
+        completed = False
+        while max_batches is None or batches < max_batches:
+            orders = await self.repository.get_archivable_orders(cutoff, last_id, batch_size)
+            if not orders:
+                completed = True
+                break
+
+            moved = await self.repository.move_to_archive(orders)
+            archived += moved
+            last_id = orders[-1]["_id"]
+            batches += 1
+            metrics.inc("orders_archived_total", moved)
+            await self.repository.save_checkpoint(cutoff, last_id, archived, completed=False)
+
+        await self.repository.save_checkpoint(cutoff, last_id, archived, completed=completed)
+        self.logger.info(f"Archived {archived} orders so far, completed: {completed}")
+
+        return {
+            "archived": archived,
+            "batches": batches,
+            "cutoff": cutoff,
+            "completed": completed
+        }
@@ -2,12 +2,23 @@
 Order business logic service
 """
 import logging
-from typing import Dict, Any
+from typing import List, Dict, Any
 
 from app.repositories.order_repository import OrderRepository
 from app.repositories.product_repository import ProductRepository
 from app.models.order import OrderCreate
+from app.core.config import settings
 from app.core.exceptions import ValidationError, NotFoundError
+from app.core.history_cache import OrderHistoryCache
+
+
+# Shared by all requests; first pages of history are served from here
+order_history_cache = OrderHistoryCache(
+    max_orders=settings.ORDER_HISTORY_CACHE_ORDERS,
+    max_users=settings.ORDER_HISTORY_CACHE_MAX_USERS,
+    max_bytes=settings.ORDER_HISTORY_CACHE_MAX_BYTES,
+    ttl=settings.ORDER_HISTORY_CACHE_TTL_SECONDS
+)
 
 
 class OrderService:
@@ -21,14 +32,28 @@ class OrderService:
     async def create_order(self, order_data: OrderCreate) -> Dict[str, str]:
         """Create a new order"""
         # Validate order data
-        await self._validate_order_data(order_data)
+        products = await self._validate_order_data(order_data)
         
         # Calculate total
-        total = await self._calculate_order_total(order_data)
+        total = self._calculate_order_total(order_data, products)
         
         # Create order
         order_id = await self.order_repository.create_order(order_data, total)
         
+        # Write through to the history cache, formatted like a history read
+        names = {product["id"]: product["name"] for product in products}
+        order_history_cache.prepend(order_data.userId, {
+            "id": order_id,
+            "items": [
+                {
+                    "productDetails": {"id": item.productId, "name": names[item.productId]},
+                    "qty": item.qty
+                }
+                for item in order_data.items
+            ],
+            "total": total
+        })
+        
         return {"id": order_id}
     
     async def get_user_orders(
@@ -45,19 +70,48 @@ class OrderService:
         if offset < 0:
             raise ValidationError("Offset must be non-negative")
         
-        orders, page_info = await self.order_repository.get_user_orders(
-            user_id=user_id,
-            limit=limit,
-            offset=offset
-        )
+        # Pages within a user's newest orders come from the history cache,
+        # which is filled with all of them on a miss
+        cached = order_history_cache.get_page(user_id, offset, limit)
+        if cached is None and offset + limit <= order_history_cache.max_orders:
+            recent_orders, total_count = await self._fill_history_cache(user_id)
+            cached = recent_orders[offset:offset + limit], total_count
+        
+        if cached is None:
+            orders, page_info = await self.order_repository.get_user_orders(
+                user_id=user_id,
+                limit=limit,
+                offset=offset
+            )
+        else:
+            orders, total_count = cached
+            next_offset = offset + limit if offset + limit < total_count else None
+            previous_offset = max(0, offset - limit) if offset > 0 else None
+            page_info = {
+                "next": str(next_offset) if next_offset is not None else None,
+                "limit": len(orders),
+                "previous": str(previous_offset) if previous_offset is not None else None
+            }
         
         return {
             "data": orders,
             "page": page_info
         }
     
-    async def _validate_order_data(self, order_data: OrderCreate):
-        """Validate order data"""
+    async def _fill_history_cache(self, user_id: str) -> tuple[List[Dict[str, Any]], int]:
+        """Read a user's newest orders into the history cache and return them"""
+        token = order_history_cache.begin_fill(user_id)
+        try:
+            orders, total_count = await self.order_repository.get_recent_orders(
+                user_id, order_history_cache.max_orders
+            )
+            order_history_cache.complete_fill(user_id, token, orders, total_count)
+        finally:
+            order_history_cache.end_fill(user_id, token)
+        return orders, total_count
+    
+    async def _validate_order_data(self, order_data: OrderCreate) -> List[Dict[str, Any]]:
+        """Validate order data and return the ordered products"""
         # Check for duplicate product IDs
         product_ids = [item.productId for item in order_data.items]
         if len(product_ids) != len(set(product_ids)):
@@ -70,12 +124,11 @@ class OrderService:
         for product_id in product_ids:
             if product_id not in found_product_ids:
                 raise NotFoundError(f"Product with ID {product_id} not found")
+        
+        return products
     
-    async def _calculate_order_total(self, order_data: OrderCreate) -> float:
+    def _calculate_order_total(self, order_data: OrderCreate, products: List[Dict[str, Any]]) -> float:
         """Calculate total order amount"""
-        product_ids = [item.productId for item in order_data.items]
-        products = await self.product_repository.get_products_by_ids(product_ids)
-        
         # Create price lookup map
         price_map = {product["id"]: product["price"] for product in products}
         
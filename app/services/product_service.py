@@ -4,9 +4,33 @@ Product business logic service
 import logging
 from typing import List, Dict, Any, Optional
 
+from bson import ObjectId
+
 from app.repositories.product_repository import ProductRepository
 from app.models.product import ProductCreate
-from app.core.exceptions import ValidationError
+from app.core.config import settings
+from app.core.exceptions import ValidationError, NotFoundError
+from app.core.loader import BatchLoader
+
+
+async def _load_products(product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Resolve a batch of product IDs with a single $in query"""
+    products = await ProductRepository().get_products_by_ids(product_ids)
+    return {product["id"]: product for product in products}
+
+
+def _normalize_id(product_id: str) -> str:
+    """Canonical lowercase form of a valid ObjectId, which batch results are keyed by"""
+    return str(ObjectId(product_id)) if ObjectId.is_valid(product_id) else product_id
+
+
+# Shared by all requests so that concurrent lookups are batched together
+product_loader = BatchLoader(
+    "products",
+    _load_products,
+    ttl=settings.PRODUCT_CACHE_TTL_SECONDS,
+    max_entries=settings.PRODUCT_CACHE_MAX_ENTRIES
+)
 
 
 class ProductService:
@@ -23,6 +47,7 @@ class ProductService:
         
         # Create product
         product_id = await self.repository.create_product(product_data)
+        product_loader.invalidate(product_id)
         
         return {"id": product_id}
     
@@ -31,9 +56,15 @@ class ProductService:
         name: Optional[str] = None,
         size: Optional[str] = None,
         limit: int = 10,
-        offset: int = 0
+        offset: int = 0,
+        facets: bool = False,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        sort: Optional[str] = None,
+        cursor: Optional[str] = None,
+        in_stock: bool = False
     ) -> Dict[str, Any]:
-        """Get products with filtering and pagination"""
+        """Get products with filtering, sorting and pagination"""
         # Validate pagination parameters
         if limit <= 0 or limit > 100:
             raise ValidationError("Limit must be between 1 and 100")
@@ -41,17 +72,58 @@ class ProductService:
         if offset < 0:
             raise ValidationError("Offset must be non-negative")
         
-        products, page_info = await self.repository.get_products(
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValidationError("minPrice must not be greater than maxPrice")
+        
+        products, page_info, facet_counts = await self.repository.get_products(
             name=name,
             size=size,
             limit=limit,
-            offset=offset
+            offset=offset,
+            facets=facets,
+            min_price=min_price,
+            max_price=max_price,
+            sort=sort,
+            cursor=cursor,
+            raw=settings.PRODUCT_LIST_RAW_BSON,
+            in_stock=in_stock
         )
         
-        return {
+        result = {
             "data": products,
             "page": page_info
         }
+        if facet_counts is not None:
+            result["facets"] = facet_counts
+        
+        return result
+    
+    async def get_product(self, product_id: str) -> Dict[str, Any]:
+        """Get a single product by ID"""
+        product = await product_loader.load(_normalize_id(product_id))
+        if product is None:
+            raise NotFoundError(f"Product with ID {product_id} not found")
+        
+        return product
+    
+    async def get_products_by_ids(self, product_ids: List[str]) -> Dict[str, Any]:
+        """Get products by IDs, in request order, skipping unknown IDs"""
+        # Remove duplicates while keeping the requested order
+        product_ids = list(dict.fromkeys(_normalize_id(product_id) for product_id in product_ids))
+        if len(product_ids) > settings.MAX_PAGE_SIZE:
+            raise ValidationError(f"At most {settings.MAX_PAGE_SIZE} product IDs can be requested")
+        
+        products = await product_loader.load_many(product_ids)
+        data = [
+            {"id": product["id"], "name": product["name"], "price": product["price"]}
+            for product in products
+            if product is not None
+        ]
+        
+        return {
+            "data": data,
+            "page": {"next": None, "limit": len(data), "previous": None, "cursor": None}
+        }
     
     async def _validate_product_data(self, product_data: ProductCreate):
         """Validate product data"""
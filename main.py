@@ -6,13 +6,19 @@ import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import settings
 from app.core.database import connect_to_mongo, close_mongo_connection
 from app.core.logging_config import setup_logging
 from app.api.v1.router import api_router
 from app.core.exceptions import AppException
+from app.core.metrics import metrics
+from app.middleware.admission import AdmissionControlMiddleware
+from app.middleware.causal import CausalConsistencyMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.deadline import DeadlineMiddleware
+from app.middleware.profiling import ProfilingMiddleware
 
 
 @asynccontextmanager
@@ -37,6 +43,43 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Opt-in request profiling, innermost so it samples the request's own task
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.PROFILE_DIR,
+        secret=settings.PROFILE_SECRET,
+        sample_rate=settings.PROFILE_SAMPLE_RATE,
+        interval_ms=settings.PROFILE_INTERVAL_MS,
+        max_files=settings.PROFILE_MAX_FILES,
+    )
+
+# Causal consistency sessions, started only for admitted requests
+if settings.CAUSAL_CONSISTENCY_ENABLED:
+    app.add_middleware(CausalConsistencyMiddleware)
+
+# Admission control middleware, outside causal sessions and profiling
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        budgets=settings.ADMISSION_BUDGETS,
+        latency_targets_ms=settings.ADMISSION_LATENCY_TARGETS_MS,
+        min_limit=settings.ADMISSION_MIN_LIMIT,
+        max_queue_wait_ms=settings.ADMISSION_MAX_QUEUE_WAIT_MS,
+        retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        prefix="/api/v1",
+    )
+
+# Request deadline middleware, outside admission control so that queue
+# wait counts against the deadline
+app.add_middleware(
+    DeadlineMiddleware,
+    timeouts_ms=settings.REQUEST_TIMEOUTS_MS,
+    default_timeout_ms=settings.REQUEST_TIMEOUT_MS,
+    max_timeout_ms=settings.MAX_REQUEST_TIMEOUT_MS,
+    prefix="/api/v1",
+)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +89,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression middleware
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    offload_size=settings.COMPRESSION_OFFLOAD_SIZE,
+    gzip_level=settings.GZIP_COMPRESSION_LEVEL,
+    brotli_quality=settings.BROTLI_COMPRESSION_QUALITY,
+)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -65,6 +117,10 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,45 @@
+"""
+Script to move old orders into the archive collection
+
+Safe to run from cron: progress is checkpointed after every batch, so an
+interrupted run resumes where it stopped.
+
+Usage:
+    python scripts/archive_orders.py --older-than-days 180 --batch-size 1000
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import connect_to_mongo, close_mongo_connection  # noqa: E402
+from app.core.logging_config import setup_logging  # noqa: E402
+from app.services.archive_service import ArchiveService  # noqa: E402
+
+
+async def archive_orders(args: argparse.Namespace):
+    """Run the order archival job"""
+    setup_logging()
+    await connect_to_mongo()
+    try:
+        result = await ArchiveService().archive_orders(
+            older_than_days=args.older_than_days,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches
+        )
+        print(
+            f"Archived {result['archived']} orders created before {result['cutoff']} "
+            f"in {result['batches']} batches (completed: {result['completed']})"
+        )
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old orders into the archive collection")
+    parser.add_argument("--older-than-days", type=int, default=None, help="Archive orders older than this")
+    parser.add_argument("--batch-size", type=int, default=None, help="Orders moved per batch")
+    parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches")
+    asyncio.run(archive_orders(parser.parse_args()))
@@ -0,0 +1,105 @@
+"""
+Benchmark response compression
+
+Reports compression ratio and CPU cost of gzip and brotli at several levels
+for product and order history pages shaped like the API responses.
+
+Usage:
+    python scripts/benchmark_compression.py --limit 100
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import zlib
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.responses import TrustedJSONResponse  # noqa: E402
+from app.middleware.compression import brotli  # noqa: E402
+
+ADJECTIVES = ["Classic", "Slim", "Relaxed", "Vintage", "Premium", "Athletic"]
+NOUNS = ["T-Shirt", "Hoodie", "Jeans", "Sneakers", "Jacket", "Cap"]
+
+
+def product_page(rng: random.Random, limit: int) -> dict:
+    """Build a GET /products page"""
+    return {
+        "data": [
+            {
+                "id": str(ObjectId()),
+                "name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {index}",
+                "price": round(rng.uniform(5, 200), 2)
+            }
+            for index in range(limit)
+        ],
+        "page": {"next": str(limit), "limit": limit, "previous": None}
+    }
+
+
+def order_page(rng: random.Random, limit: int) -> dict:
+    """Build a GET /orders/{user_id} page with nested productDetails"""
+    catalog = [
+        {"id": str(ObjectId()), "name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {index}"}
+        for index in range(200)
+    ]
+    return {
+        "data": [
+            {
+                "id": str(ObjectId()),
+                "items": [
+                    {"productDetails": product, "qty": rng.randint(1, 3)}
+                    for product in rng.sample(catalog, rng.randint(1, 5))
+                ],
+                "total": round(rng.uniform(10, 500), 2)
+            }
+            for _ in range(limit)
+        ],
+        "page": {"next": str(limit), "limit": limit, "previous": None}
+    }
+
+
+def codecs():
+    """Yield (label, compress function) pairs"""
+    for level in (1, 6, 9):
+        yield f"gzip level {level}", lambda data, level=level: zlib.compress(data, level, wbits=31)
+    if brotli is not None:
+        for quality in (1, 4, 6, 11):
+            yield f"br quality {quality}", lambda data, quality=quality: brotli.compress(data, quality=quality)
+
+
+def report(label: str, body: bytes, iterations: int):
+    """Print compression ratio and CPU cost for each codec"""
+    print(f"{label}: {len(body):,} bytes uncompressed")
+    for name, compress in codecs():
+        compressed = compress(body)
+        started = time.process_time()
+        for _ in range(iterations):
+            compress(body)
+        elapsed = (time.process_time() - started) / iterations
+        print(
+            f"  {name:<16} {len(compressed):>9,} bytes  "
+            f"ratio {len(body) / len(compressed):6.2f}  "
+            f"{elapsed * 1000:8.3f} ms CPU  "
+            f"{len(body) / elapsed / 1e6:8.1f} MB/s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response compression")
+    parser.add_argument("--limit", type=int, default=100, help="Rows per page")
+    parser.add_argument("--iterations", type=int, default=50, help="Compressions per measurement")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    response = TrustedJSONResponse(None)
+    report("GET /products", response.render(product_page(rng, args.limit)), args.iterations)
+    report("GET /orders/{user_id}", response.render(order_page(rng, args.limit)), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
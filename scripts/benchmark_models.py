@@ -0,0 +1,179 @@
+"""
+Benchmark building pydantic models from database rows
+
+Compares ObjectId validation, row model construction and list response
+serialization for product and order payloads, and reports models per second.
+
+Usage:
+    python scripts/benchmark_models.py --rows 10000
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime
+from typing import List
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+from pydantic_core import core_schema
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.responses import TrustedJSONResponse  # noqa: E402
+from app.models.order import OrderInDB, OrderItem, OrderListResponse  # noqa: E402
+from app.models.product import ProductInDB, ProductListResponse, PyObjectId, Size  # noqa: E402
+
+
+class LegacyObjectId(ObjectId):
+    """ObjectId validated by a Python function, as before the core schema"""
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        return core_schema.no_info_plain_validator_function(cls.validate)
+
+    @classmethod
+    def validate(cls, v):
+        if isinstance(v, ObjectId):
+            return v
+        if isinstance(v, str) and ObjectId.is_valid(v):
+            return ObjectId(v)
+        raise TypeError("Invalid ObjectId")
+
+
+OBJECT_ID_ADAPTER = TypeAdapter(PyObjectId)
+LEGACY_OBJECT_ID_ADAPTER = TypeAdapter(LegacyObjectId)
+PRODUCT_ROWS_ADAPTER = TypeAdapter(List[ProductInDB])
+ORDER_ROWS_ADAPTER = TypeAdapter(List[OrderInDB])
+PRODUCT_LIST_ADAPTER = TypeAdapter(ProductListResponse)
+ORDER_LIST_ADAPTER = TypeAdapter(OrderListResponse)
+
+
+def make_rows(count: int):
+    """Build product and order documents shaped like the database rows"""
+    products = [
+        {
+            "_id": ObjectId(),
+            "name": f"Classic T-Shirt {index}",
+            "price": 29.99,
+            "sizes": [
+                {"size": "small", "quantity": 10},
+                {"size": "medium", "quantity": 20},
+                {"size": "large", "quantity": 5}
+            ]
+        }
+        for index in range(count)
+    ]
+    orders = [
+        {
+            "_id": ObjectId(),
+            "userId": f"user_{index % 100}",
+            "items": [
+                {"productId": str(products[(index + offset) % count]["_id"]), "qty": 2}
+                for offset in range(3)
+            ],
+            "total": 179.94,
+            "createdAt": datetime.utcnow()
+        }
+        for index in range(count)
+    ]
+    return products, orders
+
+
+def product_response(product):
+    """Format a product row the way ProductRepository does"""
+    return {"id": str(product["_id"]), "name": product["name"], "price": product["price"]}
+
+
+def order_response(order, names):
+    """Format an order row the way OrderRepository does"""
+    return {
+        "id": str(order["_id"]),
+        "items": [
+            {
+                "productDetails": {"id": item["productId"], "name": names[item["productId"]]},
+                "qty": item["qty"]
+            }
+            for item in order["items"]
+        ],
+        "total": order["total"]
+    }
+
+
+def construct_product(row):
+    """model_construct a product row, including its nested sizes"""
+    return ProductInDB.model_construct(**{**row, "sizes": [Size.model_construct(**size) for size in row["sizes"]]})
+
+
+def construct_order(row):
+    """model_construct an order row, including its nested items"""
+    return OrderInDB.model_construct(**{**row, "items": [OrderItem.model_construct(**item) for item in row["items"]]})
+
+
+def fastapi_default(adapter: TypeAdapter, payload):
+    """Validate and serialize a payload the way FastAPI does for response_model"""
+    return json.dumps(adapter.dump_python(adapter.validate_python(payload), mode="json")).encode()
+
+
+def report(label: str, count: int, func, repeat: int):
+    """Time func and print models per second"""
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"{label:<48} {count / best:>14,.0f} models/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pydantic model construction")
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, best is reported")
+    args = parser.parse_args()
+
+    products, orders = make_rows(args.rows)
+    names = {str(product["_id"]): product["name"] for product in products}
+    hex_ids = [str(product["_id"]) for product in products]
+    page = {"next": None, "limit": args.rows, "previous": None}
+    product_payload = {"data": [product_response(row) for row in products], "page": page}
+    order_payload = {"data": [order_response(row, names) for row in orders], "page": page}
+    response = TrustedJSONResponse(None)
+
+    print(f"ObjectId ({args.rows} hex strings)")
+    report("  python validator", args.rows,
+           lambda: [LEGACY_OBJECT_ID_ADAPTER.validate_python(v) for v in hex_ids], args.repeat)
+    report("  core schema", args.rows,
+           lambda: [OBJECT_ID_ADAPTER.validate_python(v) for v in hex_ids], args.repeat)
+
+    print(f"Product rows ({args.rows})")
+    report("  ProductInDB.model_validate", args.rows,
+           lambda: [ProductInDB.model_validate(row) for row in products], args.repeat)
+    report("  cached TypeAdapter(List[ProductInDB])", args.rows,
+           lambda: PRODUCT_ROWS_ADAPTER.validate_python(products), args.repeat)
+    report("  ProductInDB.model_construct", args.rows,
+           lambda: [ProductInDB.model_construct(**row) for row in products], args.repeat)
+    report("  ProductInDB.model_construct, nested sizes", args.rows,
+           lambda: [construct_product(row) for row in products], args.repeat)
+
+    print(f"Order rows ({args.rows})")
+    report("  OrderInDB.model_validate", args.rows,
+           lambda: [OrderInDB.model_validate(row) for row in orders], args.repeat)
+    report("  cached TypeAdapter(List[OrderInDB])", args.rows,
+           lambda: ORDER_ROWS_ADAPTER.validate_python(orders), args.repeat)
+    report("  OrderInDB.model_construct", args.rows,
+           lambda: [OrderInDB.model_construct(**row) for row in orders], args.repeat)
+    report("  OrderInDB.model_construct, nested items", args.rows,
+           lambda: [construct_order(row) for row in orders], args.repeat)
+
+    print(f"Product list response ({args.rows} rows)")
+    report("  FastAPI response_model", args.rows,
+           lambda: fastapi_default(PRODUCT_LIST_ADAPTER, product_payload), args.repeat)
+    report("  TrustedJSONResponse", args.rows,
+           lambda: response.render(product_payload), args.repeat)
+
+    print(f"Order list response ({args.rows} rows)")
+    report("  FastAPI response_model", args.rows,
+           lambda: fastapi_default(ORDER_LIST_ADAPTER, order_payload), args.repeat)
+    report("  TrustedJSONResponse", args.rows,
+           lambda: response.render(order_payload), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark product list pages from BSON reply to JSON body
+
+Starts from the BSON bytes of a reply batch, as the driver receives them,
+and compares decoding full documents into dicts and formatting them in
+Python, decoding rows shaped by the server into dicts, and passing shaped
+rows through as RawBSONDocuments. Reports CPU time and peak allocated
+memory per page. Memory that python-bsonjs allocates inside libbson is not
+seen by tracemalloc.
+
+Usage:
+    python scripts/benchmark_raw_bson.py --rows 100 --pages 2000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import bson
+from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import responses  # noqa: E402
+from app.core.responses import RawBSONListResponse, TrustedJSONResponse  # noqa: E402
+
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+
+def make_batches(count: int):
+    """BSON reply batches of full product documents and of shaped rows"""
+    products = [
+        {
+            "_id": ObjectId(),
+            "name": f"Classic T-Shirt {index}",
+            "price": 29.99,
+            "sizes": [
+                {"size": "small", "quantity": 10},
+                {"size": "medium", "quantity": 20},
+                {"size": "large", "quantity": 5}
+            ]
+        }
+        for index in range(count)
+    ]
+    # What $project {name: 1, price: 1} and PRODUCT_ROW_STAGE return
+    projected = [{"_id": p["_id"], "name": p["name"], "price": p["price"]} for p in products]
+    shaped = [{"id": str(p["_id"]), "name": p["name"], "price": p["price"]} for p in products]
+    return (
+        b"".join(bson.encode(doc) for doc in projected),
+        b"".join(bson.encode(doc) for doc in shaped)
+    )
+
+
+def projected_dicts(batch: bytes, page: dict) -> bytes:
+    """Decode projected documents and format them in Python"""
+    rows = [
+        {"id": str(row["_id"]), "name": row["name"], "price": row["price"]}
+        for row in bson.decode_all(batch)
+    ]
+    return TrustedJSONResponse({"data": rows, "page": page}).body
+
+
+def shaped_dicts(batch: bytes, page: dict) -> bytes:
+    """Decode rows already shaped by the server"""
+    return TrustedJSONResponse({"data": bson.decode_all(batch), "page": page}).body
+
+
+def shaped_raw(batch: bytes, page: dict) -> bytes:
+    """Pass shaped rows through as RawBSONDocuments"""
+    rows = bson.decode_all(batch, RAW_CODEC_OPTIONS)
+    return RawBSONListResponse({"data": rows, "page": page}).body
+
+
+def measure(label: str, func, batch: bytes, page: dict, pages: int):
+    """Print CPU time and peak allocation per page"""
+    func(batch, page)
+
+    start = time.process_time()
+    for _ in range(pages):
+        func(batch, page)
+    cpu_us = (time.process_time() - start) / pages * 1_000_000
+
+    tracemalloc.start()
+    func(batch, page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<40} {cpu_us:>10,.1f} us/page {peak / 1024:>10,.1f} KiB peak")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark raw BSON product list pages")
+    parser.add_argument("--rows", type=int, default=100, help="Rows per page")
+    parser.add_argument("--pages", type=int, default=2000, help="Pages per measurement")
+    args = parser.parse_args()
+
+    projected, shaped = make_batches(args.rows)
+    page = {"next": str(args.rows), "limit": args.rows, "previous": None, "cursor": None}
+
+    print(f"Product list page ({args.rows} rows)")
+    measure("  projected rows, formatted in Python", projected_dicts, projected, page, args.pages)
+    measure("  shaped rows, decoded to dicts", shaped_dicts, shaped, page, args.pages)
+    if responses.bsonjs is not None:
+        measure("  shaped RawBSONDocument, bsonjs", shaped_raw, shaped, page, args.pages)
+    else:
+        print("  python-bsonjs is not installed, skipping the bsonjs encoder")
+    bsonjs, responses.bsonjs = responses.bsonjs, None
+    measure("  shaped RawBSONDocument, fallback", shaped_raw, shaped, page, args.pages)
+    responses.bsonjs = bsonjs
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Check how repository reads are routed across a replica set
+
+Runs the catalog and order history reads, plus an order creation, against
+a running replica set and prints which server (primary or secondary)
+handled each command. History is read through OrderRepository so that the
+order history cache does not absorb the reads. With --causal the write and
+the following history read share a causally consistent session, and the
+script checks that the new order is visible.
+
+Usage:
+    python scripts/check_read_routing.py --iterations 50 --causal
+"""
+import argparse
+import asyncio
+import os
+import sys
+from collections import Counter
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import db, causal_session  # noqa: E402
+from app.models.order import OrderCreate, OrderItem  # noqa: E402
+from app.repositories.order_repository import OrderRepository  # noqa: E402
+from app.services.order_service import OrderService  # noqa: E402
+from app.services.product_service import ProductService  # noqa: E402
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Count commands per phase and server"""
+
+    def __init__(self):
+        self.phase = "setup"
+        self.counts = Counter()
+
+    def started(self, event):
+        if event.command_name in ("find", "aggregate", "insert"):
+            self.counts[(self.phase, event.command_name, event.connection_id)] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def server_roles(client) -> dict:
+    """Map server address to its replica set role"""
+    description = client.delegate.topology_description
+    return {
+        address: server.server_type_name
+        for address, server in description.server_descriptions().items()
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Check read preference routing")
+    parser.add_argument("--iterations", type=int, default=20, help="Reads per repository method")
+    parser.add_argument("--user-id", default="user_0000001", help="User whose history is read")
+    parser.add_argument("--causal", action="store_true", help="Create an order and read it back causally")
+    parser.add_argument("--mongodb-url", default=settings.MONGODB_URL, help="MongoDB connection string")
+    args = parser.parse_args()
+
+    listener = CommandCounter()
+    client = AsyncIOMotorClient(args.mongodb_url, event_listeners=[listener])
+    db.client = client
+    db.database = client[settings.DATABASE_NAME]
+    db.routed_databases = {}
+
+    try:
+        await client.admin.command("ping")
+        product_service = ProductService()
+        order_service = OrderService()
+        order_repository = OrderRepository()
+
+        listener.phase = "ProductRepository.get_products"
+        for _ in range(args.iterations):
+            products = await product_service.get_products(limit=10)
+
+        listener.phase = "OrderRepository.get_user_orders"
+        for _ in range(args.iterations):
+            await order_repository.get_user_orders(user_id=args.user_id, limit=10)
+
+        if args.causal and products["data"]:
+            order_data = OrderCreate(
+                userId=args.user_id,
+                items=[OrderItem(productId=products["data"][0]["id"], qty=1)]
+            )
+            async with causal_session():
+                listener.phase = "create_order (causal)"
+                created = await order_service.create_order(order_data)
+
+                listener.phase = "get_user_orders after write (causal)"
+                first_page, _ = await order_repository.get_user_orders(user_id=args.user_id, limit=10)
+            visible = any(order["id"] == created["id"] for order in first_page)
+            print(f"Order {created['id']} visible to the following read: {visible}")
+
+        roles = server_roles(client)
+        print(f"{'phase':<42} {'command':<10} {'server':<24} role")
+        for (phase, command, address), count in sorted(listener.counts.items()):
+            server = f"{address[0]}:{address[1]}"
+            print(f"{phase:<42} {command:<10} {server:<24} {roles.get(address, '?')} x{count}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,92 +1,310 @@
 """
-Script to seed the database with sample data
+Script to seed the database with synthetic data
+
+Generates a deterministic dataset of products and orders for load and
+performance testing. Order volume is skewed across users and products with
+a Zipf distribution so that a few heavy users and best-selling products
+dominate, like production traffic does.
+
+Usage:
+    python scripts/seed_data.py --products 100000 --orders 10000000 --seed 42
 """
+import argparse
 import asyncio
-import logging
+import itertools
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Any
+
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
 
-# Sample data
-SAMPLE_PRODUCTS = [
-    {
-        "name": "Classic T-Shirt",
-        "price": 29.99,
-        "sizes": [
-            {"size": "small", "quantity": 50},
-            {"size": "medium", "quantity": 75},
-            {"size": "large", "quantity": 40},
-            {"size": "xl", "quantity": 25}
-        ]
-    },
-    {
-        "name": "Denim Jeans",
-        "price": 79.99,
-        "sizes": [
-            {"size": "28", "quantity": 20},
-            {"size": "30", "quantity": 35},
-            {"size": "32", "quantity": 45},
-            {"size": "34", "quantity": 30},
-            {"size": "36", "quantity": 15}
-        ]
-    },
-    {
-        "name": "Running Shoes",
-        "price": 129.99,
-        "sizes": [
-            {"size": "8", "quantity": 25},
-            {"size": "9", "quantity": 40},
-            {"size": "10", "quantity": 35},
-            {"size": "11", "quantity": 20},
-            {"size": "12", "quantity": 10}
-        ]
-    },
-    {
-        "name": "Winter Jacket",
-        "price": 199.99,
-        "sizes": [
-            {"size": "small", "quantity": 15},
-            {"size": "medium", "quantity": 25},
-            {"size": "large", "quantity": 20},
-            {"size": "xl", "quantity": 10}
-        ]
-    },
-    {
-        "name": "Baseball Cap",
-        "price": 24.99,
-        "sizes": [
-            {"size": "one-size", "quantity": 100}
-        ]
-    }
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import db, create_indexes  # noqa: E402
+
+
+# Product catalog building blocks
+ADJECTIVES = [
+    "Classic", "Slim", "Relaxed", "Vintage", "Essential", "Premium", "Organic",
+    "Lightweight", "Heavyweight", "Athletic", "Everyday", "Waterproof",
+]
+COLORS = [
+    "Black", "White", "Navy", "Grey", "Olive", "Red", "Beige", "Blue", "Green",
 ]
 
+# (category, size ladder, weight) - weight is the share of the catalog
+CATEGORIES = [
+    ("T-Shirt", ["xs", "small", "medium", "large", "xl", "xxl"], 0.25),
+    ("Hoodie", ["small", "medium", "large", "xl", "xxl"], 0.10),
+    ("Jacket", ["small", "medium", "large", "xl"], 0.08),
+    ("Jeans", ["28", "30", "32", "34", "36", "38"], 0.15),
+    ("Shorts", ["28", "30", "32", "34", "36"], 0.07),
+    ("Sneakers", ["6", "7", "8", "9", "10", "11", "12", "13"], 0.15),
+    ("Boots", ["7", "8", "9", "10", "11", "12"], 0.05),
+    ("Cap", ["one-size"], 0.08),
+    ("Socks", ["one-size"], 0.07),
+]
+
+# Log-normal price parameters (median around $40)
+PRICE_MU = 3.7
+PRICE_SIGMA = 0.6
+
+# Share of sizes that are sold out
+SOLD_OUT_RATIO = 0.1
+
+# Number of line items per order and their weights
+ITEM_COUNTS = [1, 2, 3, 4, 5]
+ITEM_COUNT_WEIGHTS = [0.50, 0.25, 0.13, 0.08, 0.04]
+
+# Quantity per line item and its weights
+QUANTITIES = [1, 2, 3, 4]
+QUANTITY_WEIGHTS = [0.70, 0.20, 0.07, 0.03]
+
+
+def zipf_cum_weights(n: int, exponent: float) -> List[float]:
+    """Cumulative Zipf weights for ranks 1..n"""
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def make_object_id(rng: random.Random, timestamp: float) -> ObjectId:
+    """Build a deterministic ObjectId for the given creation time"""
+    return ObjectId(int(timestamp).to_bytes(4, "big") + rng.getrandbits(64).to_bytes(8, "big"))
+
+
+def generate_sizes(rng: random.Random, ladder: List[str]) -> List[Dict[str, Any]]:
+    """Pick a contiguous run of sizes from the ladder with realistic stock levels"""
+    if len(ladder) == 1:
+        sizes = ladder
+    else:
+        length = rng.randint(max(1, len(ladder) // 2), len(ladder))
+        start = rng.randint(0, len(ladder) - length)
+        sizes = ladder[start:start + length]
+
+    middle = (len(sizes) - 1) / 2
+    result = []
+    for index, size in enumerate(sizes):
+        if rng.random() < SOLD_OUT_RATIO:
+            quantity = 0
+        else:
+            # Middle sizes are stocked deeper than the edges of the run
+            depth = 1.0 - abs(index - middle) / (len(sizes) + 1)
+            quantity = max(1, int(rng.expovariate(1.0 / 40) * depth))
+        result.append({"size": size, "quantity": quantity})
+    return result
+
+
+def generate_products(
+    rng: random.Random,
+    count: int,
+    created_at: datetime
+) -> List[Dict[str, Any]]:
+    """Generate product documents"""
+    weights = [category[2] for category in CATEGORIES]
+    picks = rng.choices(CATEGORIES, weights=weights, k=count)
+    timestamp = created_at.timestamp()
+
+    products = []
+    for index, (category, ladder, _) in enumerate(picks):
+        products.append({
+            "_id": make_object_id(rng, timestamp),
+            "name": f"{rng.choice(ADJECTIVES)} {rng.choice(COLORS)} {category} {index:06d}",
+            "price": round(rng.lognormvariate(PRICE_MU, PRICE_SIGMA), 2) or 0.99,
+            "sizes": generate_sizes(rng, ladder)
+        })
+    return products
+
+
+def generate_orders(
+    rng: random.Random,
+    products: List[Dict[str, Any]],
+    count: int,
+    users: int,
+    user_skew: float,
+    product_skew: float,
+    start: datetime,
+    end: datetime,
+    batch_size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    """Generate order documents in batches, ordered by creation time"""
+    # Popularity rank is independent of catalog position
+    catalog = [(str(product["_id"]), product["price"]) for product in products]
+    rng.shuffle(catalog)
+    product_weights = zipf_cum_weights(len(catalog), product_skew)
+
+    user_ids = [f"user_{rank:07d}" for rank in range(1, users + 1)]
+    rng.shuffle(user_ids)
+    user_weights = zipf_cum_weights(users, user_skew)
+
+    span = (end - start).total_seconds()
+    step = span / max(count, 1)
+    start_ts = start.timestamp()
 
-async def seed_database():
-    """Seed the database with sample data"""
+    generated = 0
+    while generated < count:
+        size = min(batch_size, count - generated)
+        batch_users = rng.choices(user_ids, cum_weights=user_weights, k=size)
+        item_counts = rng.choices(ITEM_COUNTS, weights=ITEM_COUNT_WEIGHTS, k=size)
+
+        batch = []
+        for offset in range(size):
+            # Distinct products only - duplicates are rejected by the API
+            picks = dict.fromkeys(
+                rng.choices(catalog, cum_weights=product_weights, k=item_counts[offset])
+            )
+            quantities = rng.choices(QUANTITIES, weights=QUANTITY_WEIGHTS, k=len(picks))
+
+            items = []
+            total = 0.0
+            for (product_id, price), qty in zip(picks, quantities):
+                items.append({"productId": product_id, "qty": qty})
+                total += price * qty
+
+            timestamp = start_ts + (generated + offset + rng.random()) * step
+            batch.append({
+                "_id": make_object_id(rng, timestamp),
+                "userId": batch_users[offset],
+                "items": items,
+                "total": round(total, 2),
+                "createdAt": datetime.fromtimestamp(timestamp, tz=timezone.utc).replace(tzinfo=None)
+            })
+
+        generated += size
+        yield batch
+
+
+def chunked(documents: List[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Split a list of documents into batches"""
+    for index in range(0, len(documents), size):
+        yield documents[index:index + size]
+
+
+async def _insert_worker(collection, queue: asyncio.Queue, counter: List[int]):
+    """Insert batches from the queue until a None sentinel is received"""
+    while True:
+        batch = await queue.get()
+        if batch is None:
+            return
+        await collection.insert_many(batch, ordered=False, bypass_document_validation=True)
+        counter[0] += len(batch)
+
+
+async def bulk_insert(
+    collection,
+    batches: Iterator[List[Dict[str, Any]]],
+    workers: int
+) -> int:
+    """Insert batches concurrently from several tasks and report the insert rate"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    counter = [0]
+    tasks = [
+        asyncio.create_task(_insert_worker(collection, queue, counter))
+        for _ in range(workers)
+    ]
+    started = time.perf_counter()
+
+    try:
+        for batch in itertools.chain(batches, [None] * workers):
+            put = asyncio.ensure_future(queue.put(batch))
+            done, _ = await asyncio.wait([put, *tasks], return_when=asyncio.FIRST_COMPLETED)
+            if put not in done:
+                # A worker exited before the sentinel was sent, so it failed
+                put.cancel()
+                for task in tasks:
+                    if task.done():
+                        task.result()
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    elapsed = time.perf_counter() - started
+    rate = counter[0] / elapsed if elapsed > 0 else float("inf")
+    print(f"Inserted {counter[0]} {collection.name} in {elapsed:.1f}s ({rate:,.0f} docs/s)")
+    return counter[0]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Seed the database with synthetic data")
+    parser.add_argument("--products", type=int, default=1000, help="Number of products to generate")
+    parser.add_argument("--orders", type=int, default=10000, help="Number of orders to generate")
+    parser.add_argument("--users", type=int, default=None, help="Number of distinct users (default: orders / 10)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--user-skew", type=float, default=1.1, help="Zipf exponent for orders per user")
+    parser.add_argument("--product-skew", type=float, default=1.0, help="Zipf exponent for product popularity")
+    parser.add_argument("--days", type=int, default=365, help="Spread orders over this many days")
+    parser.add_argument("--end", type=str, default=None, help="Newest order date (YYYY-MM-DD, default: today)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per insert_many call")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent insert tasks")
+    parser.add_argument("--append", action="store_true", help="Keep existing data instead of clearing it")
+    parser.add_argument("--mongodb-url", default=settings.MONGODB_URL, help="MongoDB connection string")
+    parser.add_argument("--database", default=settings.DATABASE_NAME, help="Database name")
+    args = parser.parse_args(argv)
+
+    if args.products < 1:
+        parser.error("--products must be at least 1")
+    if args.users is None:
+        args.users = max(1, args.orders // 10)
+    return args
+
+
+async def seed_database(args: argparse.Namespace):
+    """Seed the database with synthetic data"""
+    rng = random.Random(args.seed)
+    if args.end:
+        end = datetime.strptime(args.end, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    else:
+        end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=args.days)
+
+    client = AsyncIOMotorClient(args.mongodb_url, maxPoolSize=max(args.workers, 10))
     try:
-        # Connect to MongoDB
-        client = AsyncIOMotorClient("mongodb://localhost:27017")
-        db = client.ecommerce_db
-        
+        database = client[args.database]
+
         # Clear existing data
-        await db.products.delete_many({})
-        await db.orders.delete_many({})
-        
-        # Insert sample products
-        result = await db.products.insert_many(SAMPLE_PRODUCTS)
-        print(f"Inserted {len(result.inserted_ids)} products")
-        
-        # Create indexes
-        await db.products.create_index("name")
-        await db.products.create_index("sizes.size")
-        await db.orders.create_index("userId")
-        await db.orders.create_index("createdAt")
-        
+        if not args.append:
+            await database.products.drop()
+            await database.orders.drop()
+            await database.orders_archive.drop()
+            await database.archive_checkpoints.drop()
+
+        products = generate_products(rng, args.products, start)
+        await bulk_insert(database.products, chunked(products, args.batch_size), args.workers)
+
+        orders = generate_orders(
+            rng,
+            products,
+            count=args.orders,
+            users=args.users,
+            user_skew=args.user_skew,
+            product_skew=args.product_skew,
+            start=start,
+            end=end,
+            batch_size=args.batch_size
+        )
+        await bulk_insert(database.orders, orders, args.workers)
+
+        # Indexes are built after the load, which is much faster than
+        # maintaining them during millions of inserts
+        started = time.perf_counter()
+        db.client = client
+        db.database = database
+        await create_indexes()
+        print(f"Created indexes in {time.perf_counter() - started:.1f}s")
+
         print("Database seeded successfully!")
-        
+
     except Exception as e:
         print(f"Error seeding database: {e}")
+        raise
     finally:
         client.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(seed_database())
+    asyncio.run(seed_database(parse_args()))